@@ -1,5 +1,10 @@
 import random
 
+import numpy as np
+
+from aes128 import aes_encrypt_batch
+from confidence import chi_square_sf, mean_interval
+
 def bytes_to_bits(byte_list):
     return [((b >> i) & 1) for b in byte_list for i in reversed(range(8))]
 
@@ -46,6 +51,149 @@ def test_avalanche_effect(aes_func, original_key, flip_target='key', trials=10):
         print("❌ Weak avalanche effect: Cipher may be leaking structure or has poor diffusion")
 
 
+# ---------------------
+# Mergeable accumulator for the batch runner (cipher_stats.py)
+# ---------------------
+def flip_bits(blocks, bit_indices):
+    """Copy of (N, 16) uint8 `blocks` with bit_indices[n] flipped in row n (flip_bit's bit order)."""
+    blocks = blocks.copy()
+    rows = np.arange(len(blocks))
+    blocks[rows, bit_indices // 8] ^= (1 << (7 - bit_indices % 8)).astype(np.uint8)
+    return blocks
+
+def hamming_distances(a, b):
+    """Per-row Hamming distance of two (N, 16) uint8 arrays."""
+    return np.unpackbits(a ^ b, axis=1).sum(axis=1, dtype=np.int64)
+
+class AvalancheAccumulator:
+    """Ciphertext bit differences after flipping one random plaintext or key bit."""
+
+    def __init__(self, flip_target="plaintext", encrypt_batch=aes_encrypt_batch):
+        if flip_target not in ("key", "plaintext"):
+            raise ValueError("flip_target must be 'key' or 'plaintext'")
+        self.flip_target = flip_target
+        self.encrypt_batch = encrypt_batch
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+
+    def update(self, plaintexts, ciphertexts, key, rng):
+        bits = rng.integers(0, 128, len(plaintexts))
+        if self.flip_target == "plaintext":
+            flipped = self.encrypt_batch(flip_bits(plaintexts, bits), key)
+        else:
+            flipped = np.empty_like(ciphertexts)
+            keys = flip_bits(np.tile(np.asarray(key, dtype=np.uint8), (128, 1)), np.arange(128))
+            for bit in np.unique(bits):
+                rows = bits == bit
+                flipped[rows] = self.encrypt_batch(plaintexts[rows], keys[bit].tolist())
+        d = hamming_distances(ciphertexts, flipped)
+        self.n += len(d)
+        self.total += int(d.sum())
+        self.total_sq += int((d * d).sum())
+
+    def merge(self, other):
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    def result(self):
+        mean, low, high = mean_interval(self.n, self.total, self.total_sq)
+        return {"flip_target": self.flip_target, "samples": self.n,
+                "mean_bits_changed": mean, "ci95": [low, high], "fraction": mean / 128}
+
+# ---------------------
+# Full 128x128 dependency (SAC) matrix
+# ---------------------
+# Row i is the one-hot 16-byte mask of input bit i, in flip_bit's bit order;
+# np.unpackbits uses the same order for the output bits.
+BIT_MASKS = flip_bits(np.zeros((128, 16), dtype=np.uint8), np.arange(128))
+SAC_CHUNK = 2048  # base inputs per batch: 128 flipped copies of each are encrypted at once
+
+class SACAccumulator:
+    """counts[i, j] = #{bases : output bit j flips when input bit i flips}, for all 128 x 128 pairs.
+
+    Every base input is flipped in all 128 plaintext (or key) bits.  With
+    `max_per_chunk` only the first that many blocks of each update are used,
+    which keeps the 128x encryption cost bounded inside cipher_stats.py.
+    """
+
+    def __init__(self, flip_target="plaintext", max_per_chunk=None, encrypt_batch=aes_encrypt_batch):
+        if flip_target not in ("key", "plaintext"):
+            raise ValueError("flip_target must be 'key' or 'plaintext'")
+        self.flip_target = flip_target
+        self.max_per_chunk = max_per_chunk
+        self.encrypt_batch = encrypt_batch
+        self.n = 0
+        self.counts = np.zeros((128, 128), dtype=np.int64)
+
+    def _flipped_plaintexts(self, plaintexts, ciphertexts, key):
+        for start in range(0, len(plaintexts), SAC_CHUNK):
+            p = plaintexts[start:start + SAC_CHUNK]
+            flipped = (p[:, None, :] ^ BIT_MASKS).reshape(-1, 16)
+            c = self.encrypt_batch(flipped, key).reshape(len(p), 128, 16)
+            yield c ^ ciphertexts[start:start + SAC_CHUNK, None, :]
+
+    def _flipped_keys(self, plaintexts, ciphertexts, key):
+        keys = (np.asarray(key, dtype=np.uint8) ^ BIT_MASKS).tolist()
+        for start in range(0, len(plaintexts), SAC_CHUNK):
+            p = plaintexts[start:start + SAC_CHUNK]
+            c = ciphertexts[start:start + SAC_CHUNK]
+            diff = np.empty((len(p), 128, 16), dtype=np.uint8)
+            for i in range(128):
+                diff[:, i] = self.encrypt_batch(p, keys[i]) ^ c
+            yield diff
+
+    def update(self, plaintexts, ciphertexts, key, rng=None):
+        if self.max_per_chunk is not None:
+            plaintexts = plaintexts[:self.max_per_chunk]
+            ciphertexts = ciphertexts[:self.max_per_chunk]
+        flips = self._flipped_plaintexts if self.flip_target == "plaintext" else self._flipped_keys
+        for diff in flips(plaintexts, ciphertexts, key):
+            self.counts += np.unpackbits(diff, axis=2).sum(axis=0, dtype=np.int64)
+        self.n += len(plaintexts)
+
+    def merge(self, other):
+        self.n += other.n
+        self.counts += other.counts
+
+    def matrix(self):
+        return self.counts / self.n
+
+    def result(self):
+        p = self.matrix()
+        deviation = np.abs(p - 0.5)
+        i, j = np.unravel_index(deviation.argmax(), deviation.shape)
+        # Each cell is Binomial(n, 1/2) under the SAC: sum of (count - n/2)^2 / (n/4)
+        chi2 = float(((self.counts - self.n / 2) ** 2).sum() * 4 / self.n)
+        return {
+            "flip_target": self.flip_target,
+            "samples": self.n,
+            "mean_flip_probability": float(p.mean()),
+            "sac_max_deviation": float(deviation.max()),
+            "sac_mean_deviation": float(deviation.mean()),
+            "worst_bit": {"input": int(i), "output": int(j), "probability": float(p[i, j])},
+            "mean_bits_changed_per_input_bit": p.sum(axis=1).round(4).tolist(),
+            "chi_square": chi2,
+            "chi_square_df": p.size,
+            "chi_square_p_value": chi_square_sf(chi2, p.size),
+            "matrix": p.round(6).tolist(),
+        }
+
+def test_avalanche_matrix(key, samples=4096, flip_target="plaintext", seed=None):
+    rng = np.random.default_rng(seed)
+    plaintexts = rng.integers(0, 256, (samples, 16), dtype=np.uint8)
+    acc = SACAccumulator(flip_target)
+    acc.update(plaintexts, aes_encrypt_batch(plaintexts, key), key)
+    r = acc.result()
+    print(f"{flip_target} flips: {samples} bases x 128 bits")
+    print(f"SAC deviation: max {r['sac_max_deviation']:.4f}, mean {r['sac_mean_deviation']:.4f}")
+    w = r["worst_bit"]
+    print(f"Worst pair: input bit {w['input']} -> output bit {w['output']} flips with p={w['probability']:.4f}")
+    print(f"Chi-square: {r['chi_square']:.1f} (df={r['chi_square_df']}, p={r['chi_square_p_value']:.3f})")
+    return acc
+
+
 # ---------------------
 # Plug in your AES function
 # ---------------------
@@ -61,3 +209,7 @@ if __name__ == "__main__":
 
     print("\nTesting Avalanche Effect with bit flip in key:")
     test_avalanche_effect(aes_encrypt, fixed_key, flip_target='key', trials=10)
+
+    print("\nFull 128x128 dependency matrix:")
+    test_avalanche_matrix(fixed_key, samples=4096, flip_target='plaintext')
+    test_avalanche_matrix(fixed_key, samples=4096, flip_target='key')
@@ -1,5 +1,11 @@
+import math
 import random
 
+import numpy as np
+
+from aes128 import aes_encrypt_batch
+from confidence import chi_square_sf, mean_interval
+
 def hamming_distance_bytes(a, b):
     return sum(bin(x ^ y).count('1') for x, y in zip(a, b))
 
@@ -26,6 +32,139 @@ def test_differential_uniformity(aes_encrypt, key, trials=1000, diff_pos=0):
     else:
         print("✅ Good diffusion — resistant to differential cryptanalysis")
 
+class DifferentialAccumulator:
+    """Ciphertext Hamming distance for plaintext pairs with a fixed input difference."""
+
+    def __init__(self, diff_pos=0, delta=0x01, encrypt_batch=aes_encrypt_batch):
+        self.diff_pos = diff_pos
+        self.delta = delta
+        self.encrypt_batch = encrypt_batch
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+
+    def update(self, plaintexts, ciphertexts, key, rng):
+        p2 = plaintexts.copy()
+        p2[:, self.diff_pos] ^= self.delta
+        c2 = self.encrypt_batch(p2, key)
+        d = np.unpackbits(ciphertexts ^ c2, axis=1).sum(axis=1, dtype=np.int64)
+        self.n += len(d)
+        self.total += int(d.sum())
+        self.total_sq += int((d * d).sum())
+
+    def merge(self, other):
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    def result(self):
+        mean, low, high = mean_interval(self.n, self.total, self.total_sq)
+        return {"diff_pos": self.diff_pos, "delta": self.delta, "samples": self.n,
+                "mean_hamming_distance": mean, "ci95": [low, high]}
+
+# ----------- Output-difference histograms for many input differences ------------
+DIFF_BLOCK = 32  # input differences encrypted together, n * DIFF_BLOCK blocks per batch
+
+def single_bit_differences():
+    """The 128 one-bit differences, bit k in byte k // 8 at position 7 - k % 8."""
+    return np.packbits(np.eye(128, dtype=np.uint8), axis=1)
+
+def byte_differences(values=(0xFF,), positions=range(16)):
+    """One difference per (position, value): `value` in byte `position`, zero elsewhere."""
+    deltas = [np.eye(16, dtype=np.uint8)[pos] * np.uint8(v) for pos in positions for v in values]
+    return np.array(deltas, dtype=np.uint8).reshape(-1, 16)
+
+DEFAULT_DIFFERENCES = np.concatenate([single_bit_differences(), byte_differences()])
+
+class DifferentialHistogramAccumulator:
+    """Per input difference: histograms of every output byte difference and of the Hamming weight.
+
+    byte_counts[d, j, v] counts pairs with input difference d whose
+    ciphertexts differ by v in byte j; weight_counts[d, w] counts pairs whose
+    ciphertext difference has Hamming weight w.  With `max_per_chunk` only
+    that many base plaintexts of each update are used.
+    """
+
+    def __init__(self, differences=DEFAULT_DIFFERENCES, max_per_chunk=None, encrypt_batch=aes_encrypt_batch):
+        self.differences = np.array(differences, dtype=np.uint8).reshape(-1, 16)
+        if not self.differences.any(axis=1).all():
+            raise ValueError("Input differences must be nonzero")
+        self.max_per_chunk = max_per_chunk
+        self.encrypt_batch = encrypt_batch
+        self.n = 0
+        d = len(self.differences)
+        self.byte_counts = np.zeros((d, 16, 256), dtype=np.int64)
+        self.weight_counts = np.zeros((d, 129), dtype=np.int64)
+
+    def update(self, plaintexts, ciphertexts, key, rng=None):
+        if self.max_per_chunk is not None:
+            plaintexts = plaintexts[:self.max_per_chunk]
+            ciphertexts = ciphertexts[:self.max_per_chunk]
+        n = len(plaintexts)
+        for start in range(0, len(self.differences), DIFF_BLOCK):
+            deltas = self.differences[start:start + DIFF_BLOCK]
+            b = len(deltas)
+            pairs = (plaintexts[:, None, :] ^ deltas).reshape(-1, 16)
+            diff = self.encrypt_batch(pairs, key).reshape(n, b, 16) ^ ciphertexts[:, None, :]
+            # index (difference, output byte, value) into one bincount
+            cells = (np.arange(b)[None, :, None] * 16 + np.arange(16)) * 256 + diff
+            self.byte_counts[start:start + b] += np.bincount(
+                cells.ravel(), minlength=b * 16 * 256).reshape(b, 16, 256)
+            weights = np.unpackbits(diff, axis=2).sum(axis=2, dtype=np.int64)
+            self.weight_counts[start:start + b] += np.bincount(
+                (np.arange(b) * 129 + weights).ravel(), minlength=b * 129).reshape(b, 129)
+        self.n += n
+
+    def merge(self, other):
+        self.n += other.n
+        self.byte_counts += other.byte_counts
+        self.weight_counts += other.weight_counts
+
+    def chi_square(self):
+        """Chi-square of each (difference, output byte) histogram against uniform, 255 df."""
+        expected = self.n / 256
+        return ((self.byte_counts - expected) ** 2).sum(axis=2) / expected
+
+    def result(self, alpha=0.01, worst=10):
+        chi2 = self.chi_square()
+        p = np.vectorize(lambda x: chi_square_sf(x, 255))(chi2)
+        limit = alpha / chi2.size  # Bonferroni over every (difference, byte) pair
+        flagged = np.argwhere(p < limit)
+        order = np.argsort(p, axis=None)[:worst]
+        w = np.arange(129)
+        mean_weight = (self.weight_counts @ w) / self.n
+        sd_weight = np.sqrt(np.maximum((self.weight_counts @ (w * w)) / self.n - mean_weight ** 2, 0))
+
+        def pair(d, j):
+            return {"delta_in": self.differences[d].tobytes().hex(), "output_byte": int(j),
+                    "chi_square": float(chi2[d, j]), "p_value": float(p[d, j]),
+                    "max_probability": float(self.byte_counts[d, j].max() / self.n)}
+
+        return {
+            "samples": self.n,
+            "differences": len(self.differences),
+            "alpha": alpha,
+            "flagged": [pair(d, j) for d, j in flagged],
+            "worst": [pair(*divmod(int(i), 16)) for i in order],
+            "mean_hamming_weight": mean_weight.round(4).tolist(),
+            "hamming_weight_sd": sd_weight.round(4).tolist(),
+            # Binomial(128, 1/2) has mean 64, sd sqrt(32)
+            "max_weight_deviation_sigma": float(np.abs(mean_weight - 64).max() / math.sqrt(32 / self.n)),
+        }
+
+def test_differential_histograms(key, samples=4096, differences=DEFAULT_DIFFERENCES, seed=None):
+    rng = np.random.default_rng(seed)
+    p = rng.integers(0, 256, (samples, 16), dtype=np.uint8)
+    acc = DifferentialHistogramAccumulator(differences)
+    acc.update(p, aes_encrypt_batch(p, key), key)
+    r = acc.result()
+    print(f"{r['differences']} input differences x {samples} pairs")
+    print(f"Flagged (difference, output byte) pairs: {len(r['flagged'])}")
+    w = r["worst"][0]
+    print(f"Least uniform: delta {w['delta_in']} byte {w['output_byte']} (p={w['p_value']:.4f})")
+    print(f"Largest mean Hamming weight deviation: {r['max_weight_deviation_sigma']:.2f} sigma")
+    return acc
+
 if __name__ == "__main__":
     from aes128 import aes_encrypt
 
@@ -36,3 +175,6 @@ if __name__ == "__main__":
 
     print("\n== Differential Cryptanalysis Test ==")
     test_differential_uniformity(aes_encrypt, key, trials=1000, diff_pos=0)
+
+    print("\n== Output-difference histograms ==")
+    test_differential_histograms(key, samples=4096)
@@ -1,26 +1,32 @@
 import numpy as np
-import galois
+from gf256 import gf_mul, gf_pow
+from gf2 import columns_to_rows, identity, inverse, matmul, pack_rows, to_lut, unpack_rows
 
 # Step 1: Define GF(2^8) with irreducible polynomial 0x1F5 (x^8 + x^7 + x^6 + x^5 + x^4 + x^2 + 1)
-primitive_poly = galois.Poly.Int(0x1F5)
-GF256 = galois.GF(2**8, irreducible_poly=primitive_poly)
+POLY = 0x1F5
+
+def mul(*factors):
+    result = 1
+    for f in factors:
+        result = gf_mul(result, f, POLY)
+    return result
 
 # Step 2: Choose triplet values (y, z, w)
-y = GF256(0x13)
-z = GF256(0x7a)
-w = GF256(0x5d)
+y = 0x13
+z = 0x7a
+w = 0x5d
 
 
 # Step 3: Construct the basis as per structured powers
 basis = [
-    (w**2) * (z**4) * (y**16),   # χ0
-    (w**1) * (z**4) * (y**16),   # χ1
-    (w**2) * (z**1) * (y**16),   # χ2
-    (w**1) * (z**1) * (y**16),   # χ3
-    (w**2) * (z**4) * (y**1),    # χ4
-    (w**1) * (z**4) * (y**1),    # χ5
-    (w**2) * (z**1) * (y**1),    # χ6
-    (w**1) * (z**1) * (y**1),    # χ7
+    mul(gf_pow(w, 2, POLY), gf_pow(z, 4, POLY), gf_pow(y, 16, POLY)),   # χ0
+    mul(w, gf_pow(z, 4, POLY), gf_pow(y, 16, POLY)),                    # χ1
+    mul(gf_pow(w, 2, POLY), z, gf_pow(y, 16, POLY)),                    # χ2
+    mul(w, z, gf_pow(y, 16, POLY)),                                     # χ3
+    mul(gf_pow(w, 2, POLY), gf_pow(z, 4, POLY), y),                     # χ4
+    mul(w, gf_pow(z, 4, POLY), y),                                      # χ5
+    mul(gf_pow(w, 2, POLY), z, y),                                      # χ6
+    mul(w, z, y),                                                       # χ7
 ]
 
 # Step 4: Build Isomorphism Matrix X (Each column = bit representation of χi)
@@ -37,8 +43,22 @@ print(X)
 
 # Step 6: Inverse of X in GF(2)
 try:
-    X_inv = np.linalg.inv(X) % 2
+    X_rows = pack_rows(X)
+    X_inv_rows = inverse(X_rows)
+    X_inv = unpack_rows(X_inv_rows)
     print("\nInverse of X (X⁻¹):")
     print(X_inv.astype(int))
-except np.linalg.LinAlgError:
+    print("X · X⁻¹ = I:", matmul(X_rows, X_inv_rows) == identity())
+except ValueError:
     print("\nMatrix X is not invertible in GF(2)")
+    X_inv_rows = None
+
+# Step 7: X and X⁻¹ as 256-entry lookup tables, applied to every byte at once.
+# The printed matrices list bit 7 first; the tables use LSB-first row masks,
+# so bit j of a coordinate vector selects χj and X_LUT[1 << j] == χj.
+if X_inv_rows is not None:
+    X_lsb_rows = columns_to_rows(basis)
+    X_LUT = to_lut(X_lsb_rows)
+    X_INV_LUT = to_lut(inverse(X_lsb_rows))
+    print("X_LUT[1 << j] = χj for all j:", all(int(X_LUT[1 << j]) == basis[j] for j in range(8)))
+    print("Round trip X⁻¹(X(v)) = v for all bytes:", bool((X_INV_LUT[X_LUT] == np.arange(256)).all()))
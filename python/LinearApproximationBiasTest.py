@@ -1,4 +1,10 @@
+import math
 import random
+from statistics import NormalDist
+
+import numpy as np
+
+from confidence import proportion_interval
 
 def test_linear_approximation_bias(aes_encrypt, key, trials=10000):
     biased_count = 0
@@ -25,6 +31,162 @@ def test_linear_approximation_bias(aes_encrypt, key, trials=10000):
     else:
         print("✅ No significant bias (secure)")
 
+class LinearBiasAccumulator:
+    """Counts of (P[0] ^ P[5] ^ C[2]) & 1 == 0, the approximation tested above."""
+
+    def __init__(self):
+        self.n = 0
+        self.zeros = 0
+
+    def update(self, plaintexts, ciphertexts, key, rng):
+        parity = (plaintexts[:, 0] ^ plaintexts[:, 5] ^ ciphertexts[:, 2]) & 1
+        self.n += len(parity)
+        self.zeros += int(len(parity) - parity.sum(dtype=int))
+
+    def merge(self, other):
+        self.n += other.n
+        self.zeros += other.zeros
+
+    def result(self):
+        p, low, high = proportion_interval(self.zeros, self.n)
+        # |p - 1/2| over the interval; 0 when the interval contains 1/2
+        bias_low = 0.0 if low <= 0.5 <= high else min(abs(low - 0.5), abs(high - 0.5))
+        return {"samples": self.n, "p_parity_zero": p, "ci95": [low, high],
+                "bias": abs(p - 0.5), "bias_ci95": [bias_low, max(abs(low - 0.5), abs(high - 0.5))]}
+
+# ----------- All-masks correlation engine ------------
+# Every plaintext and ciphertext bit becomes one column of packed uint64
+# words (sample n is bit n % 64 of word n // 64), with bits numbered like
+# np.unpackbits: bit k is byte k // 8, bit 7 - k % 8.  The parity of a mask
+# pair is the XOR of its columns, and the approximation holds for the
+# samples whose parity bit is 0, so each mask costs one XOR-reduce and one
+# popcount per 64 samples.
+MASK_BLOCK = 256  # masks whose parity columns are built at once
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _POPCOUNT8 = np.array([bin(x).count("1") for x in range(256)], dtype=np.uint8)
+
+    def _popcount(words):
+        return _POPCOUNT8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def pack_columns(plaintexts, ciphertexts):
+    """(256, ceil(N / 64)) uint64: rows 0-127 are plaintext bits, 128-255 ciphertext bits."""
+    bits = np.unpackbits(np.concatenate([plaintexts, ciphertexts], axis=1), axis=1)
+    packed = np.packbits(bits.T, axis=1, bitorder="little")
+    pad = -packed.shape[1] % 8  # zero padding never adds to a parity count
+    packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+def mask_columns(in_mask, out_mask):
+    """Column indices selected by a 16-byte input mask and a 16-byte output mask."""
+    in_bits = np.flatnonzero(np.unpackbits(np.frombuffer(in_mask, dtype=np.uint8)))
+    out_bits = np.flatnonzero(np.unpackbits(np.frombuffer(out_mask, dtype=np.uint8)))
+    return tuple(in_bits) + tuple(out_bits + 128)
+
+# The approximation of test_linear_approximation_bias: P[0] ^ P[5] ^ C[2], low bits
+DEFAULT_MASKS = [([1, 0, 0, 0, 0, 1] + [0] * 10, [0, 0, 1] + [0] * 13)]
+
+class LinearCorrelationAccumulator:
+    """Parity-one counts for every single-bit mask pair and for user mask pairs.
+
+    `masks` is a sequence of (input mask, output mask) pairs, each 16 bytes.
+    """
+
+    def __init__(self, masks=DEFAULT_MASKS, single_bits=True):
+        self.masks = [(np.asarray(a, dtype=np.uint8).tobytes(), np.asarray(b, dtype=np.uint8).tobytes())
+                      for a, b in masks]
+        if any(len(a) != 16 or len(b) != 16 for a, b in self.masks):
+            raise ValueError("Masks must be 16 bytes.")
+        self.single_bits = single_bits
+        self.n = 0
+        self.single_ones = np.zeros((128, 128), dtype=np.int64)
+        self.mask_ones = np.zeros(len(self.masks), dtype=np.int64)
+        # masks grouped by weight so the columns of a group stack into one array
+        groups = {}
+        for m, (a, b) in enumerate(self.masks):
+            cols = mask_columns(a, b)
+            groups.setdefault(len(cols), []).append((m, cols))
+        self._groups = [(np.array([m for m, _ in g]), np.array([c for _, c in g], dtype=np.intp).reshape(len(g), w))
+                        for w, g in groups.items()]
+
+    def update(self, plaintexts, ciphertexts, key=None, rng=None):
+        columns = pack_columns(plaintexts, ciphertexts)
+        self.n += len(plaintexts)
+        if self.single_bits:
+            p, c = columns[:128], columns[128:]
+            weight_p, weight_c = _popcount(p), _popcount(c)
+            both = np.stack([_popcount(p[i] & c) for i in range(128)])
+            # |p ^ c| = |p| + |c| - 2 |p & c|
+            self.single_ones += weight_p[:, None] + weight_c[None, :] - 2 * both
+        for indices, cols in self._groups:
+            for start in range(0, len(indices), MASK_BLOCK):
+                block = cols[start:start + MASK_BLOCK]
+                if block.shape[1] == 0:
+                    continue
+                parity = np.bitwise_xor.reduce(columns[block], axis=1)
+                self.mask_ones[indices[start:start + MASK_BLOCK]] += _popcount(parity)
+
+    def merge(self, other):
+        self.n += other.n
+        self.single_ones += other.single_ones
+        self.mask_ones += other.mask_ones
+
+    def _bias(self, ones):
+        """Bias P[parity = 0] - 1/2 and its z-score (sd = 1 / (2 sqrt n) under no correlation)."""
+        bias = (self.n - ones) / self.n - 0.5
+        return bias, bias * 2 * math.sqrt(self.n)
+
+    def threshold(self, tests, alpha=0.01):
+        """|bias| above which one of `tests` masks is significant at level alpha (Bonferroni)."""
+        z = NormalDist().inv_cdf(1 - alpha / (2 * tests))
+        return z / (2 * math.sqrt(self.n))
+
+    def result(self, alpha=0.01, worst=10):
+        report = {"samples": self.n, "alpha": alpha}
+        if self.single_bits:
+            bias, z = self._bias(self.single_ones)
+            limit = self.threshold(bias.size, alpha)
+            order = np.argsort(-np.abs(bias), axis=None)[:worst]
+            report["single_bit"] = {
+                "masks": int(bias.size),
+                "max_abs_bias": float(np.abs(bias).max()),
+                "threshold": limit,
+                "significant": int((np.abs(bias) > limit).sum()),
+                "worst": [{"input_bit": int(i // 128), "output_bit": int(i % 128),
+                           "bias": float(bias.flat[i]), "z": float(z.flat[i])} for i in order],
+                # bias[i][j] for plaintext bit i and ciphertext bit j
+                "matrix": bias.round(6).tolist(),
+                "z_matrix": z.round(3).tolist(),
+            }
+        if self.masks:
+            bias, z = self._bias(self.mask_ones)
+            limit = self.threshold(len(self.masks), alpha)
+            report["masks"] = [{"in_mask": a.hex(), "out_mask": b.hex(), "bias": float(bias[m]),
+                                "z": float(z[m]), "p_value": math.erfc(abs(z[m]) / math.sqrt(2)),
+                                "significant": bool(abs(bias[m]) > limit)}
+                               for m, (a, b) in enumerate(self.masks)]
+            report["masks_threshold"] = limit
+        return report
+
+def test_linear_correlations(key, samples=1 << 20, masks=DEFAULT_MASKS, chunk_size=1 << 16, seed=None):
+    from aes128 import aes_encrypt_batch
+
+    rng = np.random.default_rng(seed)
+    acc = LinearCorrelationAccumulator(masks)
+    for start in range(0, samples, chunk_size):
+        p = rng.integers(0, 256, (min(chunk_size, samples - start), 16), dtype=np.uint8)
+        acc.update(p, aes_encrypt_batch(p, key))
+    r = acc.result()
+    s = r["single_bit"]
+    print(f"{s['masks']} single-bit masks over {samples} samples: max |bias| {s['max_abs_bias']:.5f}, "
+          f"threshold {s['threshold']:.5f}, {s['significant']} significant")
+    for m in r["masks"]:
+        print(f"Mask {m['in_mask']} -> {m['out_mask']}: bias {m['bias']:+.5f} (p={m['p_value']:.3f})")
+    return acc
+
 if __name__ == "__main__":
     from aes128 import aes_encrypt
 
@@ -35,3 +197,6 @@ if __name__ == "__main__":
 
     print("== Linear Cryptanalysis Test ==")
     test_linear_approximation_bias(aes_encrypt, key, trials=10000)
+
+    print("\n== All single-bit masks ==")
+    test_linear_correlations(key, samples=1 << 20)
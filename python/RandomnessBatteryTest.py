@@ -0,0 +1,334 @@
+# Streaming randomness battery modeled on NIST SP 800-22
+# Every test keeps constant-size state and consumes the stream one chunk at a
+# time (bits are taken MSB first within each byte), so GB-scale ciphertext
+# streams can be tested.  Serial and approximate entropy share one table of
+# overlapping, cyclically wrapped pattern counts.
+
+import json
+import math
+import sys
+from statistics import NormalDist
+
+import numpy as np
+
+from aes128 import aes_encrypt_batch, counter_blocks, ctr_keystream
+from aes_stream import STREAM_CHUNK, iter_chunks
+from confidence import gamma_q
+
+ALPHA = 0.01
+POPCOUNT8 = np.array([bin(x).count("1") for x in range(256)], dtype=np.int64)
+
+class MonobitTest:
+    def __init__(self):
+        self.n = 0
+        self.ones = 0
+
+    def update(self, data, bits):
+        self.n += len(bits)
+        self.ones += int(POPCOUNT8[data].sum())
+
+    def result(self):
+        s = 2 * self.ones - self.n
+        return {"statistic": s, "p_value": math.erfc(abs(s) / math.sqrt(2 * self.n))}
+
+class _ByteBlocks:
+    """Regroups byte chunks into whole blocks of `block_bytes`, keeping the remainder."""
+
+    def __init__(self, block_bytes):
+        self.block_bytes = block_bytes
+        self.pending = np.zeros(0, dtype=np.uint8)
+
+    def blocks(self, data):
+        data = np.concatenate([self.pending, data]) if len(self.pending) else data
+        full = len(data) - len(data) % self.block_bytes
+        self.pending = data[full:].copy()
+        return data[:full].reshape(-1, self.block_bytes)
+
+class BlockFrequencyTest:
+    def __init__(self, block_bits=1 << 20):
+        if block_bits % 8:
+            raise ValueError("block_bits must be a multiple of 8")
+        self.block_bits = block_bits
+        self._blocks = _ByteBlocks(block_bits // 8)
+        self.count = 0
+        self.sum_sq = 0.0
+
+    def update(self, data, bits):
+        blocks = self._blocks.blocks(data)
+        pi = POPCOUNT8[blocks].sum(axis=1) / self.block_bits
+        self.count += len(blocks)
+        self.sum_sq += float(((pi - 0.5) ** 2).sum())
+
+    def result(self):
+        if not self.count:
+            return {"p_value": None, "note": "stream shorter than one block"}
+        chi2 = 4 * self.block_bits * self.sum_sq
+        return {"blocks": self.count, "block_bits": self.block_bits, "statistic": chi2,
+                "p_value": gamma_q(self.count / 2, chi2 / 2)}
+
+class RunsTest:
+    def __init__(self):
+        self.n = 0
+        self.ones = 0
+        self.transitions = 0
+        self.last = None
+
+    def update(self, data, bits):
+        if not len(bits):
+            return
+        self.transitions += int((bits[1:] != bits[:-1]).sum())
+        if self.last is not None:
+            self.transitions += int(bits[0] != self.last)
+        self.last = bits[-1]
+        self.n += len(bits)
+        self.ones += int(bits.sum(dtype=np.int64))
+
+    def result(self):
+        pi = self.ones / self.n
+        if abs(pi - 0.5) >= 2 / math.sqrt(self.n):
+            return {"statistic": None, "p_value": 0.0, "note": "frequency prerequisite failed"}
+        v = self.transitions + 1
+        p = math.erfc(abs(v - 2 * self.n * pi * (1 - pi)) / (2 * math.sqrt(2 * self.n) * pi * (1 - pi)))
+        return {"statistic": v, "p_value": p}
+
+# (block length M) -> (category upper bounds, probabilities) from SP 800-22, section 2.4
+LONGEST_RUN_CLASSES = {
+    8: ([1, 2, 3], [0.2148, 0.3672, 0.2305, 0.1875]),
+    128: ([4, 5, 6, 7, 8], [0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124]),
+    10000: ([10, 11, 12, 13, 14, 15], [0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727]),
+}
+
+def longest_runs(blocks):
+    """Longest run of ones in each row of a (B, M) 0/1 array."""
+    b, m = blocks.shape
+    padded = np.zeros((b, m + 1), dtype=np.uint8)
+    padded[:, :m] = blocks
+    zeros = np.flatnonzero(padded.ravel() == 0)  # every row ends with a zero
+    runs = np.diff(zeros, prepend=-1) - 1
+    longest = np.zeros(b, dtype=np.int64)
+    np.maximum.at(longest, zeros // (m + 1), runs)
+    return longest
+
+class LongestRunTest:
+    def __init__(self, block_bits=10000):
+        if block_bits not in LONGEST_RUN_CLASSES:
+            raise ValueError(f"block_bits must be one of {sorted(LONGEST_RUN_CLASSES)}")
+        self.block_bits = block_bits
+        self.bounds, self.probs = LONGEST_RUN_CLASSES[block_bits]
+        self._blocks = _ByteBlocks(block_bits // 8)
+        self.counts = np.zeros(len(self.probs), dtype=np.int64)
+
+    def update(self, data, bits):
+        blocks = self._blocks.blocks(data)
+        if len(blocks):
+            runs = longest_runs(np.unpackbits(blocks, axis=1))
+            self.counts += np.bincount(np.searchsorted(self.bounds, runs), minlength=len(self.probs))
+
+    def result(self):
+        n = int(self.counts.sum())
+        if not n:
+            return {"p_value": None, "note": "stream shorter than one block"}
+        expected = n * np.array(self.probs)
+        chi2 = float(((self.counts - expected) ** 2 / expected).sum())
+        return {"blocks": n, "block_bits": self.block_bits, "statistic": chi2,
+                "p_value": gamma_q((len(self.probs) - 1) / 2, chi2 / 2)}
+
+class CyclicPatternCounts:
+    """Counts of all overlapping m-bit patterns, the stream wrapped around at the end.
+
+    Window starts are read from 32-bit big-endian words, so m <= 25.  The
+    last three bytes wait for the next chunk (or for the wrap-around at the
+    end) before their windows are counted.
+    """
+
+    def __init__(self, m):
+        if not 1 <= m <= 25:
+            raise ValueError("m must be between 1 and 25")
+        self.m = m
+        self.counts = np.zeros(1 << m, dtype=np.int64)
+        self.head = np.zeros(0, dtype=np.uint8)
+        self.tail = np.zeros(0, dtype=np.uint8)
+        self.n = 0
+
+    def _count(self, data, starts):
+        d = data.astype(np.uint32)
+        words = (d[:starts] << 24) | (d[1:starts + 1] << 16) | (d[2:starts + 2] << 8) | d[3:starts + 3]
+        mask = np.uint32((1 << self.m) - 1)
+        counts = np.zeros(1 << self.m, dtype=np.int64)
+        for r in range(8):
+            counts += np.bincount((words >> np.uint32(32 - r - self.m)) & mask, minlength=1 << self.m)
+        return counts
+
+    def update(self, data):
+        self.n += 8 * len(data)
+        if len(self.head) < 3:
+            self.head = np.concatenate([self.head, data[:3 - len(self.head)]])
+        data = np.concatenate([self.tail, data])
+        starts = max(len(data) - 3, 0)
+        if starts:
+            self.counts += self._count(data, starts)
+        self.tail = data[starts:].copy()
+
+    def pattern_counts(self, k):
+        """Cyclic counts of k-bit patterns, k <= m, including the wrapped windows."""
+        # the pending tail and the stream head are repeated to cover the wrap
+        data = np.concatenate([self.tail, np.resize(self.head, 3)])
+        counts = self.counts + self._count(data, len(self.tail))
+        return counts.reshape(1 << k, -1).sum(axis=1)
+
+class SerialTest:
+    def __init__(self, patterns, m=16):
+        self.patterns = patterns
+        self.m = m
+
+    def update(self, data, bits):
+        pass  # shared CyclicPatternCounts is updated by the battery
+
+    def _psi(self, k):
+        if k <= 0:
+            return 0.0
+        v = self.patterns.pattern_counts(k)
+        n = self.patterns.n
+        return float((v * v).sum()) * (1 << k) / n - n
+
+    def result(self):
+        m = self.m
+        psi = [self._psi(m), self._psi(m - 1), self._psi(m - 2)]
+        d1 = psi[0] - psi[1]
+        d2 = psi[0] - 2 * psi[1] + psi[2]
+        return {"m": m, "statistic": [d1, d2],
+                "p_value": [gamma_q(2 ** (m - 2), d1 / 2), gamma_q(2 ** (m - 3), d2 / 2)]}
+
+class ApproximateEntropyTest:
+    def __init__(self, patterns, m=10):
+        self.patterns = patterns
+        self.m = m
+
+    def update(self, data, bits):
+        pass
+
+    def _phi(self, k):
+        c = self.patterns.pattern_counts(k) / self.patterns.n
+        c = c[c > 0]
+        return float((c * np.log(c)).sum())
+
+    def result(self):
+        n = self.patterns.n
+        apen = self._phi(self.m) - self._phi(self.m + 1)
+        chi2 = 2 * n * (math.log(2) - apen)
+        return {"m": self.m, "statistic": chi2, "p_value": gamma_q(2 ** (self.m - 1), chi2 / 2)}
+
+class CumulativeSumsTest:
+    """Forward and backward cusum from the running sum of ±1 and its extremes."""
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+        self.max_partial = 0  # over S_0 = 0 .. S_n
+        self.min_partial = 0
+        self.max_before_last = 0  # over S_0 .. S_{n-1}, for the backward sums
+        self.min_before_last = 0
+
+    def update(self, data, bits):
+        if not len(bits):
+            return
+        partial = self.total + np.cumsum(2 * bits.astype(np.int64) - 1)
+        self.max_before_last = max(self.max_before_last, self.max_partial)
+        self.min_before_last = min(self.min_before_last, self.min_partial)
+        if len(partial) > 1:
+            self.max_before_last = max(self.max_before_last, int(partial[:-1].max()))
+            self.min_before_last = min(self.min_before_last, int(partial[:-1].min()))
+        self.max_partial = max(self.max_partial, int(partial.max()))
+        self.min_partial = min(self.min_partial, int(partial.min()))
+        self.total = int(partial[-1])
+        self.n += len(bits)
+
+    @staticmethod
+    def _p_value(z, n):
+        phi = NormalDist().cdf
+        root = math.sqrt(n)
+        first = sum(phi((4 * k + 1) * z / root) - phi((4 * k - 1) * z / root)
+                    for k in range(int((-n / z + 1) / 4), int((n / z - 1) / 4) + 1))
+        second = sum(phi((4 * k + 3) * z / root) - phi((4 * k + 1) * z / root)
+                     for k in range(int((-n / z - 3) / 4), int((n / z - 1) / 4) + 1))
+        return 1 - first + second
+
+    def result(self):
+        forward = max(self.max_partial, -self.min_partial)
+        backward = max(self.total - self.min_before_last, self.max_before_last - self.total)
+        return {"statistic": [forward, backward],
+                "p_value": [self._p_value(forward, self.n), self._p_value(backward, self.n)]}
+
+class RandomnessBattery:
+    def __init__(self, block_frequency_bits=1 << 20, longest_run_bits=10000, serial_m=16, apen_m=10):
+        self.patterns = CyclicPatternCounts(max(serial_m, apen_m + 1))
+        self.tests = {
+            "monobit": MonobitTest(),
+            "block_frequency": BlockFrequencyTest(block_frequency_bits),
+            "runs": RunsTest(),
+            "longest_run": LongestRunTest(longest_run_bits),
+            "serial": SerialTest(self.patterns, serial_m),
+            "approximate_entropy": ApproximateEntropyTest(self.patterns, apen_m),
+            "cumulative_sums": CumulativeSumsTest(),
+        }
+        self.bytes = 0
+
+    def update(self, chunk):
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        bits = np.unpackbits(data)
+        self.patterns.update(data)
+        for test in self.tests.values():
+            test.update(data, bits)
+        self.bytes += len(data)
+
+    def result(self, alpha=ALPHA):
+        report = {"bytes": self.bytes, "alpha": alpha, "tests": {}}
+        for name, test in self.tests.items():
+            r = test.result()
+            p = r["p_value"]
+            if p is not None:
+                r["passed"] = all(v >= alpha for v in (p if isinstance(p, list) else [p]))
+            report["tests"][name] = r
+        return report
+
+def ciphertext_stream(key, nbytes, mode="ctr", nonce=b"\x00" * 8, chunk_size=STREAM_CHUNK):
+    """Yield `nbytes` of ciphertext: the CTR keystream, or ECB over counter plaintexts."""
+    for offset in range(0, nbytes, chunk_size):
+        n = min(chunk_size, nbytes - offset)
+        if mode == "ctr":
+            yield ctr_keystream(key, nonce, offset, n).tobytes()
+        elif mode == "ecb":
+            first, count = offset // 16, (n + 15) // 16
+            yield aes_encrypt_batch(counter_blocks(nonce, first, count), key).tobytes()[:n]
+        else:
+            raise ValueError("mode must be 'ecb' or 'ctr'")
+
+def test_randomness(chunks, **options):
+    battery = RandomnessBattery(**options)
+    for chunk in chunks:
+        battery.update(chunk)
+    return battery.result()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SP 800-22 style battery over a ciphertext stream")
+    parser.add_argument("--bytes", type=int, default=1 << 24, help="ciphertext bytes to generate")
+    parser.add_argument("--mode", choices=("ctr", "ecb"), default="ctr")
+    parser.add_argument("--key", default="2b7e151628aed2a6abf7158809cf4f3c", help="16-byte key in hex")
+    parser.add_argument("--input", help="test this file instead of generated ciphertext")
+    parser.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as source:
+            report = test_randomness(iter_chunks(source))
+    else:
+        report = test_randomness(ciphertext_stream(list(bytes.fromhex(args.key)), args.bytes, args.mode))
+    report["source"] = args.input or {"mode": args.mode, "bytes": args.bytes}
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -2,21 +2,22 @@
 # Author: Gaurav Pratap
 
 import os 
+import multiprocessing as mp
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+import gf256
+import gf2
 
 # Rijndael irreducible polynomial for GF(2^8): x^8 + x^4 + x^3 + x + 1 = 0x11B
 AES_MOD = 0x11B
 
 # Affine transformation matrix for S-box
-AFFINE_MATRIX = [
-    0xF1,  # 11110001
-    0xE3,  # 11100011
-    0xC7,  # 11000111
-    0x8F,  # 10001111
-    0x1F,  # 00011111
-    0x3E,  # 00111110
-    0x7C,  # 01111100
-    0xF8   # 11111000
-]
+AFFINE_MATRIX = gf2.AFFINE_MATRIX
+AFFINE_CONSTANT = 0xFF
+AFFINE_LUT = gf2.to_lut(AFFINE_MATRIX, AFFINE_CONSTANT).tolist()
 
 # Round constants for key expansion
 RCON = [0x01]
@@ -28,43 +29,25 @@ def xtime(a):
 
 def gf_mul(a, b):
     """Galois field multiplication in GF(2^8)"""
-    res = 0
-    for i in range(8):
-        if b & 1:
-            res ^= a
-        a = xtime(a)
-        b >>= 1
-    return res & 0xFF
+    return gf256.gf_mul(a, b, AES_MOD)
 
 def gf_inv(a):
     """Multiplicative inverse in GF(2^8)"""
-    if a == 0:
-        return 0
-    for i in range(1, 256):
-        if gf_mul(a, i) == 1:
-            return i
-    return 0
+    return gf256.gf_inv(a, AES_MOD)
 
 def affine_transform(byte):
     """Apply AES affine transformation to a byte"""
-    result = 0
-    for i in range(8):
-        # Rotate and XOR bits according to AES affine transformation definition
-        bit = (
-            ((byte >> i) & 1) ^
-            ((byte >> ((i + 4) % 8)) & 1) ^
-            ((byte >> ((i + 5) % 8)) & 1) ^
-            ((byte >> ((i + 6) % 8)) & 1) ^
-            ((byte >> ((i + 7) % 8)) & 1) ^ 1
-        )
-        result |= (bit << i)
-    return result
+    return AFFINE_LUT[byte]
 
 def generate_sbox():
     return [affine_transform(gf_inv(i)) for i in range(256)]
 
 SBOX = generate_sbox()
 
+INV_SBOX = [0] * 256
+for i, s in enumerate(SBOX):
+    INV_SBOX[s] = i
+
 def sub_bytes(state):
     return [SBOX[b] for b in state]
 
@@ -95,6 +78,32 @@ def mix_columns(state):
 def add_round_key(state, round_key):
     return [b ^ k for b, k in zip(state, round_key)]
 
+def inv_sub_bytes(state):
+    return [INV_SBOX[b] for b in state]
+
+def inv_shift_rows(state):
+    out = [0] * 16
+    for i, j in enumerate(shift_rows(list(range(16)))):
+        out[j] = state[i]
+    return out
+
+def inv_mix_columns(state):
+    def inv_mix_single_column(col):
+        return [
+            gf_mul(col[0], 14) ^ gf_mul(col[1], 11) ^ gf_mul(col[2], 13) ^ gf_mul(col[3], 9),
+            gf_mul(col[0], 9) ^ gf_mul(col[1], 14) ^ gf_mul(col[2], 11) ^ gf_mul(col[3], 13),
+            gf_mul(col[0], 13) ^ gf_mul(col[1], 9) ^ gf_mul(col[2], 14) ^ gf_mul(col[3], 11),
+            gf_mul(col[0], 11) ^ gf_mul(col[1], 13) ^ gf_mul(col[2], 9) ^ gf_mul(col[3], 14),
+        ]
+    # Undo mix_columns, which wrote output column i from input row i
+    new_state = [0] * 16
+    for i in range(4):
+        col = state[4 * i:4 * i + 4]
+        mixed = inv_mix_single_column(col)
+        for j in range(4):
+            new_state[i + 4 * j] = mixed[j]
+    return new_state
+
 def key_expansion(key):
     key_symbols = list(key)
     if len(key_symbols) != 16:
@@ -116,12 +125,14 @@ def pad_pkcs7(data):
     return data + bytes([pad_len] * pad_len)
 
 def unpad_pkcs7(data):
+    if not data or len(data) % 16:
+        raise ValueError("Invalid padding")
     pad_len = data[-1]
-    if pad_len < 1 or pad_len > 16:
+    if pad_len < 1 or pad_len > 16 or data[-pad_len:] != bytes([pad_len]) * pad_len:
         raise ValueError("Invalid padding")
     return data[:-pad_len]
 
-def aes_encrypt(plaintext, key):
+def aes_encrypt_reference(plaintext, key):
     if len(plaintext) != 16:
         raise ValueError("Plaintext must be 16 bytes.")
     round_keys = key_expansion(key)
@@ -137,16 +148,532 @@ def aes_encrypt(plaintext, key):
     state = add_round_key(state, round_keys[10])
     return state
 
+def aes_decrypt_reference(ciphertext, key):
+    if len(ciphertext) != 16:
+        raise ValueError("Ciphertext must be 16 bytes.")
+    round_keys = key_expansion(key)
+    state = list(ciphertext)
+    state = add_round_key(state, round_keys[10])
+    state = inv_shift_rows(state)
+    state = inv_sub_bytes(state)
+    for round in range(9, 0, -1):
+        state = add_round_key(state, round_keys[round])
+        state = inv_mix_columns(state)
+        state = inv_shift_rows(state)
+        state = inv_sub_bytes(state)
+    state = add_round_key(state, round_keys[0])
+    return state
+
+# ----------- T-TABLE ENGINE (32-bit word lookups) ------------
+# mix_columns reads output column i from row i of its input, so the round
+# word for column i gathers byte i of every input column.  Each T_k holds
+# S[x] multiplied by column k of the MixColumns matrix, packed big-endian.
+def _build_t_tables(sbox):
+    t0 = []
+    for x in range(256):
+        s = sbox[x]
+        s2 = xtime(s) & 0xFF
+        s3 = s2 ^ s
+        t0.append((s2 << 24) | (s << 16) | (s << 8) | s3)
+    t1 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in t0]
+    t2 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in t1]
+    t3 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in t2]
+    return t0, t1, t2, t3
+
+T0, T1, T2, T3 = _build_t_tables(SBOX)
+
+# The inverse round maps input columns to output rows, so the equivalent
+# inverse cipher keeps its state as four row words (byte k = column k).
+# IT_j holds INV_SBOX[x] multiplied by column j of the InvMixColumns matrix.
+def _build_inv_t_tables(inv_sbox):
+    it0 = []
+    for x in range(256):
+        s = inv_sbox[x]
+        it0.append((gf_mul(s, 14) << 24) | (gf_mul(s, 9) << 16) |
+                   (gf_mul(s, 13) << 8) | gf_mul(s, 11))
+    it1 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in it0]
+    it2 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in it1]
+    it3 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in it2]
+    return it0, it1, it2, it3
+
+IT0, IT1, IT2, IT3 = _build_inv_t_tables(INV_SBOX)
+
+def _row_words(block):
+    return [int.from_bytes(bytes(block[j::4]), "big") for j in range(4)]
+
+def decryption_key_words(round_keys):
+    """Pack round keys for the equivalent inverse cipher.
+
+    Words 0-3 are round key 10 as rows, words 4-39 are InvMixColumns applied
+    to round keys 9..1 (as rows) and words 40-43 are round key 0 as columns.
+    """
+    words = _row_words(round_keys[10])
+    for rk in round_keys[9:0:-1]:
+        for i in range(4):
+            # IT_j[SBOX[b]] is b times column j of InvMixColumns
+            col = rk[4 * i:4 * i + 4]
+            words.append(IT0[SBOX[col[0]]] ^ IT1[SBOX[col[1]]] ^
+                         IT2[SBOX[col[2]]] ^ IT3[SBOX[col[3]]])
+    words += [int.from_bytes(bytes(round_keys[0][4*j:4*j+4]), "big") for j in range(4)]
+    return words
+
+def round_key_words(round_keys):
+    """Pack 11 16-byte round keys into 44 big-endian column words."""
+    return [int.from_bytes(bytes(rk[4*j:4*j+4]), "big") for rk in round_keys for j in range(4)]
+
+def _encrypt_words(block, rk):
+    s0 = int.from_bytes(block[0:4], "big") ^ rk[0]
+    s1 = int.from_bytes(block[4:8], "big") ^ rk[1]
+    s2 = int.from_bytes(block[8:12], "big") ^ rk[2]
+    s3 = int.from_bytes(block[12:16], "big") ^ rk[3]
+    for r in range(4, 40, 4):
+        t0 = T0[s0 >> 24] ^ T1[s1 >> 24] ^ T2[s2 >> 24] ^ T3[s3 >> 24] ^ rk[r]
+        t1 = (T0[(s1 >> 16) & 0xFF] ^ T1[(s2 >> 16) & 0xFF] ^
+              T2[(s3 >> 16) & 0xFF] ^ T3[(s0 >> 16) & 0xFF] ^ rk[r + 1])
+        t2 = (T0[(s2 >> 8) & 0xFF] ^ T1[(s3 >> 8) & 0xFF] ^
+              T2[(s0 >> 8) & 0xFF] ^ T3[(s1 >> 8) & 0xFF] ^ rk[r + 2])
+        t3 = T0[s3 & 0xFF] ^ T1[s0 & 0xFF] ^ T2[s1 & 0xFF] ^ T3[s2 & 0xFF] ^ rk[r + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+    # Last round: SubBytes + ShiftRows only
+    return [
+        SBOX[s0 >> 24] ^ (rk[40] >> 24), SBOX[(s1 >> 16) & 0xFF] ^ ((rk[40] >> 16) & 0xFF),
+        SBOX[(s2 >> 8) & 0xFF] ^ ((rk[40] >> 8) & 0xFF), SBOX[s3 & 0xFF] ^ (rk[40] & 0xFF),
+        SBOX[s1 >> 24] ^ (rk[41] >> 24), SBOX[(s2 >> 16) & 0xFF] ^ ((rk[41] >> 16) & 0xFF),
+        SBOX[(s3 >> 8) & 0xFF] ^ ((rk[41] >> 8) & 0xFF), SBOX[s0 & 0xFF] ^ (rk[41] & 0xFF),
+        SBOX[s2 >> 24] ^ (rk[42] >> 24), SBOX[(s3 >> 16) & 0xFF] ^ ((rk[42] >> 16) & 0xFF),
+        SBOX[(s0 >> 8) & 0xFF] ^ ((rk[42] >> 8) & 0xFF), SBOX[s1 & 0xFF] ^ (rk[42] & 0xFF),
+        SBOX[s3 >> 24] ^ (rk[43] >> 24), SBOX[(s0 >> 16) & 0xFF] ^ ((rk[43] >> 16) & 0xFF),
+        SBOX[(s1 >> 8) & 0xFF] ^ ((rk[43] >> 8) & 0xFF), SBOX[s2 & 0xFF] ^ (rk[43] & 0xFF),
+    ]
+
+def _decrypt_words(block, dk):
+    r0, r1, r2, r3 = _row_words(block)
+    r0 ^= dk[0]
+    r1 ^= dk[1]
+    r2 ^= dk[2]
+    r3 ^= dk[3]
+    for r in range(4, 40, 4):
+        t0 = (IT0[r0 >> 24] ^ IT1[r1 & 0xFF] ^
+              IT2[(r2 >> 8) & 0xFF] ^ IT3[(r3 >> 16) & 0xFF] ^ dk[r])
+        t1 = (IT0[(r0 >> 16) & 0xFF] ^ IT1[r1 >> 24] ^
+              IT2[r2 & 0xFF] ^ IT3[(r3 >> 8) & 0xFF] ^ dk[r + 1])
+        t2 = (IT0[(r0 >> 8) & 0xFF] ^ IT1[(r1 >> 16) & 0xFF] ^
+              IT2[r2 >> 24] ^ IT3[r3 & 0xFF] ^ dk[r + 2])
+        t3 = (IT0[r0 & 0xFF] ^ IT1[(r1 >> 8) & 0xFF] ^
+              IT2[(r2 >> 16) & 0xFF] ^ IT3[r3 >> 24] ^ dk[r + 3])
+        r0, r1, r2, r3 = t0, t1, t2, t3
+    # Last round: InvShiftRows + InvSubBytes, output in column order
+    return [
+        INV_SBOX[r0 >> 24] ^ (dk[40] >> 24), INV_SBOX[r1 & 0xFF] ^ ((dk[40] >> 16) & 0xFF),
+        INV_SBOX[(r2 >> 8) & 0xFF] ^ ((dk[40] >> 8) & 0xFF), INV_SBOX[(r3 >> 16) & 0xFF] ^ (dk[40] & 0xFF),
+        INV_SBOX[(r0 >> 16) & 0xFF] ^ (dk[41] >> 24), INV_SBOX[r1 >> 24] ^ ((dk[41] >> 16) & 0xFF),
+        INV_SBOX[r2 & 0xFF] ^ ((dk[41] >> 8) & 0xFF), INV_SBOX[(r3 >> 8) & 0xFF] ^ (dk[41] & 0xFF),
+        INV_SBOX[(r0 >> 8) & 0xFF] ^ (dk[42] >> 24), INV_SBOX[(r1 >> 16) & 0xFF] ^ ((dk[42] >> 16) & 0xFF),
+        INV_SBOX[r2 >> 24] ^ ((dk[42] >> 8) & 0xFF), INV_SBOX[r3 & 0xFF] ^ (dk[42] & 0xFF),
+        INV_SBOX[r0 & 0xFF] ^ (dk[43] >> 24), INV_SBOX[(r1 >> 8) & 0xFF] ^ ((dk[43] >> 16) & 0xFF),
+        INV_SBOX[(r2 >> 16) & 0xFF] ^ ((dk[43] >> 8) & 0xFF), INV_SBOX[r3 >> 24] ^ (dk[43] & 0xFF),
+    ]
+
+# ----------- CACHED KEY SCHEDULE ------------
+KEY_CACHE_SIZE = 64
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key_words(key_bytes):
+    return tuple(round_key_words(key_expansion(key_bytes)))
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_decryption_key_words(key_bytes):
+    return tuple(decryption_key_words(key_expansion(key_bytes)))
+
+def expand_key_words(key):
+    """Return the 44 round-key words for `key`, reusing recently expanded schedules."""
+    key_bytes = bytes(key)
+    if len(key_bytes) != 16:
+        raise ValueError("Key must be 16 bytes.")
+    return _cached_key_words(key_bytes)
+
+def expand_decryption_key_words(key):
+    """Return the 44 equivalent-inverse-cipher key words for `key` (cached)."""
+    key_bytes = bytes(key)
+    if len(key_bytes) != 16:
+        raise ValueError("Key must be 16 bytes.")
+    return _cached_decryption_key_words(key_bytes)
+
+class AES128:
+    """AES-128 cipher bound to one key; the key schedule is expanded once."""
+
+    def __init__(self, key):
+        self.round_keys = expand_key_words(key)
+        self.decryption_keys = expand_decryption_key_words(key)
+
+    def encrypt_block(self, block):
+        if len(block) != 16:
+            raise ValueError("Block must be 16 bytes.")
+        return bytes(_encrypt_words(bytes(block), self.round_keys))
+
+    def encrypt_blocks(self, data):
+        """Encrypt a whole number of 16-byte blocks (no padding)."""
+        data = bytes(data)
+        if len(data) % 16:
+            raise ValueError("Data length must be a multiple of 16 bytes.")
+        rk = self.round_keys
+        out = bytearray(len(data))
+        for i in range(0, len(data), 16):
+            out[i:i+16] = _encrypt_words(data[i:i+16], rk)
+        return bytes(out)
+
+    def decrypt_block(self, block):
+        if len(block) != 16:
+            raise ValueError("Block must be 16 bytes.")
+        return bytes(_decrypt_words(bytes(block), self.decryption_keys))
+
+    def decrypt_blocks(self, data):
+        """Decrypt a whole number of 16-byte blocks (padding is left in place)."""
+        data = bytes(data)
+        if len(data) % 16:
+            raise ValueError("Data length must be a multiple of 16 bytes.")
+        dk = self.decryption_keys
+        out = bytearray(len(data))
+        for i in range(0, len(data), 16):
+            out[i:i+16] = _decrypt_words(data[i:i+16], dk)
+        return bytes(out)
+
+def aes_encrypt_ttable(plaintext, key):
+    if len(plaintext) != 16:
+        raise ValueError("Plaintext must be 16 bytes.")
+    return _encrypt_words(bytes(plaintext), expand_key_words(key))
+
+def aes_decrypt_ttable(ciphertext, key):
+    if len(ciphertext) != 16:
+        raise ValueError("Ciphertext must be 16 bytes.")
+    return _decrypt_words(bytes(ciphertext), expand_decryption_key_words(key))
+
+ENGINES = {
+    "reference": aes_encrypt_reference,
+    "ttable": aes_encrypt_ttable,
+}
+DECRYPT_ENGINES = {
+    "reference": aes_decrypt_reference,
+    "ttable": aes_decrypt_ttable,
+}
+DEFAULT_ENGINE = "ttable"
+
+def aes_encrypt(plaintext, key, *, engine=None):
+    """Encrypt one 16-byte block; `engine` selects "ttable" (default) or "reference"."""
+    try:
+        encrypt = ENGINES[engine or DEFAULT_ENGINE]
+    except KeyError:
+        raise ValueError(f"Unknown engine: {engine!r}") from None
+    return encrypt(plaintext, key)
+
+def aes_decrypt(ciphertext, key, *, engine=None):
+    """Decrypt one 16-byte block; `engine` selects "ttable" (default) or "reference"."""
+    try:
+        decrypt = DECRYPT_ENGINES[engine or DEFAULT_ENGINE]
+    except KeyError:
+        raise ValueError(f"Unknown engine: {engine!r}") from None
+    return decrypt(ciphertext, key)
+
+# ----------- NUMPY BATCH ENGINE ------------
+SBOX_NP = np.array(SBOX, dtype=np.uint8)
+XTIME2_NP = np.array([xtime(x) & 0xFF for x in range(256)], dtype=np.uint8)
+XTIME3_NP = XTIME2_NP ^ np.arange(256, dtype=np.uint8)
+
+SHIFT_ROWS_PERM = np.array(shift_rows(list(range(16))), dtype=np.intp)
+# _MIX_GATHER[k][4*i + j] is the SubBytes output index that meets coefficient
+# column k when mix_columns produces byte j of output column i.
+_MIX_GATHER = [
+    SHIFT_ROWS_PERM[[4 * ((j + k) % 4) + i for i in range(4) for j in range(4)]]
+    for k in range(4)
+]
+
+INV_SBOX_NP = np.array(INV_SBOX, dtype=np.uint8)
+_GF_MUL_NP = {c: gf256.mul_table(AES_MOD)[c] for c in (9, 11, 13, 14)}
+INV_SHIFT_ROWS_PERM = np.argsort(SHIFT_ROWS_PERM)
+# inv_mix_columns writes row i from input column i; _INV_MIX_GATHER[m] picks
+# the input byte that meets coefficient (14, 11, 13, 9)[m], with InvShiftRows
+# folded into the index.
+_INV_MIX_GATHER = [
+    np.array([4 * i + (k + m) % 4 for k in range(4) for i in range(4)], dtype=np.intp)[INV_SHIFT_ROWS_PERM]
+    for m in range(4)
+]
+
+BATCH_CHUNK = 1 << 16
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_round_key_array(key_bytes):
+    rk = np.array(key_expansion(key_bytes), dtype=np.uint8)
+    rk.setflags(write=False)
+    return rk
+
+def round_key_array(key):
+    """Return the round keys of `key` as an (11, 16) uint8 array."""
+    key_bytes = bytes(key)
+    if len(key_bytes) != 16:
+        raise ValueError("Key must be 16 bytes.")
+    return _cached_round_key_array(key_bytes)
+
+def _as_block_matrix(blocks):
+    blocks = np.asarray(blocks, dtype=np.uint8)
+    if blocks.ndim == 1 and blocks.size % 16 == 0:
+        blocks = blocks.reshape(-1, 16)
+    if blocks.ndim != 2 or blocks.shape[1] != 16:
+        raise ValueError("Blocks must have shape (N, 16).")
+    return blocks
+
+def _encrypt_matrix(state, rk):
+    g0, g1, g2, g3 = _MIX_GATHER
+    state = state ^ rk[0]
+    for round in range(1, 10):
+        b = SBOX_NP[state]
+        state = XTIME2_NP[b[:, g0]] ^ XTIME3_NP[b[:, g1]] ^ b[:, g2] ^ b[:, g3]
+        state ^= rk[round]
+    state = SBOX_NP[state][:, SHIFT_ROWS_PERM]
+    state ^= rk[10]
+    return state
+
+def _decrypt_matrix(state, rk):
+    h0, h1, h2, h3 = _INV_MIX_GATHER
+    m14, m11, m13, m9 = _GF_MUL_NP[14], _GF_MUL_NP[11], _GF_MUL_NP[13], _GF_MUL_NP[9]
+    state = state ^ rk[10]
+    state = INV_SBOX_NP[state[:, INV_SHIFT_ROWS_PERM]]
+    for round in range(9, 0, -1):
+        state ^= rk[round]
+        state = INV_SBOX_NP[m14[state[:, h0]] ^ m11[state[:, h1]] ^ m13[state[:, h2]] ^ m9[state[:, h3]]]
+    state ^= rk[0]
+    return state
+
+def _encrypt_bitsliced(state, rk):
+    from aes_bitslice import encrypt_sliced
+    return encrypt_sliced(state, rk)
+
+BATCH_ENGINES = {
+    "numpy": _encrypt_matrix,
+    "bitslice": _encrypt_bitsliced,
+}
+
+def _map_blocks(func, blocks, key, chunk_size, out):
+    blocks = _as_block_matrix(blocks)
+    rk = round_key_array(key)
+    if out is None:
+        out = np.empty_like(blocks)
+    elif out.shape != blocks.shape or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array shaped like the input blocks.")
+    for start in range(0, len(blocks), chunk_size):
+        stop = start + chunk_size
+        out[start:stop] = func(blocks[start:stop], rk)
+    return out
+
+def aes_encrypt_batch(plaintexts, key, chunk_size=BATCH_CHUNK, *, engine="numpy", out=None):
+    """Encrypt an (N, 16) uint8 array of blocks under one key; returns (N, 16) uint8."""
+    try:
+        encrypt = BATCH_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown batch engine: {engine!r}") from None
+    return _map_blocks(encrypt, plaintexts, key, chunk_size, out)
+
+def aes_decrypt_batch(ciphertexts, key, chunk_size=BATCH_CHUNK, *, out=None):
+    """Decrypt an (N, 16) uint8 array of blocks under one key; returns (N, 16) uint8."""
+    return _map_blocks(_decrypt_matrix, ciphertexts, key, chunk_size, out)
+
+# ----------- REDUCED-ROUND BATCHES ------------
+# Round r < 10 uses round key r of the full key schedule; the last round
+# skips MixColumns unless mix_last is set.  Captured states are taken after
+# the AddRoundKey of each requested round (0 is the initial whitening).
+
+def _shift_mix(b):
+    """ShiftRows followed by MixColumns of a SubBytes output batch."""
+    g0, g1, g2, g3 = _MIX_GATHER
+    return XTIME2_NP[b[:, g0]] ^ XTIME3_NP[b[:, g1]] ^ b[:, g2] ^ b[:, g3]
+
+def _run_rounds(state, rk, first, rounds, mix_last, capture, states):
+    """Apply rounds first..rounds to `state`, the state after round first - 1."""
+    for r in range(first, rounds + 1):
+        b = SBOX_NP[state]
+        if r < rounds or mix_last:
+            state = _shift_mix(b)
+        else:
+            state = b[:, SHIFT_ROWS_PERM]
+        state ^= rk[r]
+        if r in capture:
+            states[r].append(state)
+    return state
+
+def _check_rounds(rounds, capture):
+    if not 1 <= rounds <= 10:
+        raise ValueError("rounds must be between 1 and 10.")
+    capture = frozenset(capture or ())
+    if not all(0 <= r <= rounds for r in capture):
+        raise ValueError("Captured rounds must lie between 0 and rounds.")
+    return capture
+
+def aes_encrypt_rounds(plaintexts, key, rounds=10, *, capture=None, mix_last=False, chunk_size=BATCH_CHUNK):
+    """Encrypt (N, 16) blocks with `rounds` rounds.
+
+    Returns the (N, 16) output, or (output, {round: (N, 16) state}) when
+    `capture` lists rounds whose states should be kept.
+    """
+    capture_set = _check_rounds(rounds, capture)
+    blocks = _as_block_matrix(plaintexts)
+    rk = round_key_array(key)
+    states = {r: [] for r in capture_set}
+    outputs = []
+    for start in range(0, len(blocks), chunk_size):
+        state = blocks[start:start + chunk_size] ^ rk[0]
+        if 0 in capture_set:
+            states[0].append(state)
+        outputs.append(_run_rounds(state, rk, 1, rounds, mix_last, capture_set, states))
+    out = np.concatenate(outputs) if outputs else np.empty((0, 16), dtype=np.uint8)
+    if capture is None:
+        return out
+    return out, {r: np.concatenate(s) if s else np.empty((0, 16), dtype=np.uint8) for r, s in states.items()}
+
+# _BYTE_ROUND1[j][s] is ShiftRows + MixColumns of a state that is s at byte j
+# and zero elsewhere.  Plaintexts that differ only in byte j differ only in
+# byte j after the first SubBytes, so by linearity their round-1 states are
+# the shared base state XOR one table row.
+_BYTE_ROUND1 = _shift_mix(
+    (np.eye(16, dtype=np.uint8)[:, None, :] * np.arange(256, dtype=np.uint8)[None, :, None]).reshape(-1, 16)
+).reshape(16, 256, 16)
+LAMBDA_CHUNK_SETS = 256
+
+def aes_encrypt_byte_variants(bases, key, position, deltas=range(256), rounds=4, *, capture=None,
+                              mix_last=False, chunk_sets=LAMBDA_CHUNK_SETS):
+    """Encrypt every base block with byte `position` XORed by each delta.
+
+    With the default deltas each base yields a full Λ-set; deltas (0, d)
+    gives one-byte-difference pairs.  Round 1 is computed once per base and
+    shared by its variants.  Returns an (S, V, 16) array, or (array,
+    {round: (S, V, 16) state}) when `capture` is given.
+    """
+    capture_set = _check_rounds(rounds, capture)
+    bases = _as_block_matrix(bases)
+    deltas = np.asarray(deltas, dtype=np.uint8)
+    rk = round_key_array(key)
+    if rounds == 1 and not mix_last:
+        # no MixColumns to share; expand the variants directly
+        plaintexts = np.repeat(bases[:, None, :], len(deltas), axis=1)
+        plaintexts[:, :, position] ^= deltas
+        result = aes_encrypt_rounds(plaintexts.reshape(-1, 16), key, rounds, capture=capture, mix_last=mix_last)
+        if capture is None:
+            return result.reshape(len(bases), len(deltas), 16)
+        out, states = result
+        return out.reshape(len(bases), len(deltas), 16), {
+            r: s.reshape(len(bases), len(deltas), 16) for r, s in states.items()}
+    table = _BYTE_ROUND1[position]
+    states = {r: [] for r in capture_set}
+    outputs = []
+    for start in range(0, len(bases), chunk_sets):
+        x0 = bases[start:start + chunk_sets] ^ rk[0]
+        n = len(x0)
+        variant_bytes = x0[:, position, None] ^ deltas  # (n, V)
+        if 0 in capture_set:
+            s0 = np.repeat(x0[:, None, :], len(deltas), axis=1)
+            s0[:, :, position] = variant_bytes
+            states[0].append(s0.reshape(-1, 16))
+        b = SBOX_NP[x0]
+        base_state = _shift_mix(b) ^ rk[1]
+        diff = SBOX_NP[variant_bytes] ^ b[:, position, None]
+        state = (base_state[:, None, :] ^ table[diff]).reshape(-1, 16)
+        if 1 in capture_set:
+            states[1].append(state)
+        outputs.append(_run_rounds(state, rk, 2, rounds, mix_last, capture_set, states))
+    shape = (len(bases), len(deltas), 16)
+    out = np.concatenate(outputs).reshape(shape) if outputs else np.empty(shape, dtype=np.uint8)
+    if capture is None:
+        return out
+    return out, {r: np.concatenate(s).reshape(shape) if s else np.empty(shape, dtype=np.uint8)
+                 for r, s in states.items()}
+
 def encrypt_ecb(plaintext_bytes, key_bytes):
     if len(key_bytes) != 16:
         raise ValueError("Key must be 16 bytes.")
-    padded = pad_pkcs7(plaintext_bytes)
-    blocks = [padded[i:i+16] for i in range(0, len(padded), 16)]
-    cipher_blocks = []
-    for block in blocks:
-        ct = aes_encrypt(list(block), list(key_bytes))
-        cipher_blocks.extend(ct)
-    return bytes(cipher_blocks) 
+    return AES128(key_bytes).encrypt_blocks(pad_pkcs7(bytes(plaintext_bytes)))
+
+def decrypt_ecb(ciphertext_bytes, key_bytes):
+    if len(key_bytes) != 16:
+        raise ValueError("Key must be 16 bytes.")
+    return unpad_pkcs7(AES128(key_bytes).decrypt_blocks(ciphertext_bytes))
+
+# ----------- CTR MODE ------------
+# The initial counter block is the nonce zero-padded to 16 bytes; block i of
+# the stream uses that block plus i as a 128-bit big-endian integer.
+CTR_SEGMENT_BLOCKS = 1 << 16
+CTR_PARALLEL_THRESHOLD = 1 << 22  # bytes
+CTR_WINDOW = 2  # segments in flight per worker
+
+def _initial_counter(nonce):
+    nonce = bytes(nonce)
+    if not 1 <= len(nonce) <= 16:
+        raise ValueError("Nonce must be 1 to 16 bytes.")
+    return int.from_bytes(nonce + bytes(16 - len(nonce)), "big")
+
+def counter_blocks(nonce, first_block, count):
+    """Counter blocks first_block .. first_block + count - 1 as a (count, 16) uint8 array."""
+    start = (_initial_counter(nonce) + first_block) % (1 << 128)
+    base_lo = np.uint64(start & 0xFFFFFFFFFFFFFFFF)
+    lo = base_lo + np.arange(count, dtype=np.uint64)
+    hi = np.uint64(start >> 64) + (lo < base_lo).astype(np.uint64)
+    out = np.empty((count, 16), dtype=np.uint8)
+    out[:, :8] = hi.astype(">u8").view(np.uint8).reshape(count, 8)
+    out[:, 8:] = lo.astype(">u8").view(np.uint8).reshape(count, 8)
+    return out
+
+def ctr_keystream(key, nonce, offset, length):
+    """Keystream bytes [offset, offset + length) as a uint8 array."""
+    first_block, skip = divmod(offset, 16)
+    count = (skip + length + 15) // 16
+    stream = aes_encrypt_batch(counter_blocks(nonce, first_block, count), key)
+    return stream.reshape(-1)[skip:skip + length]
+
+def _ctr_segment(args):
+    key, nonce, offset, data = args
+    return (np.frombuffer(data, dtype=np.uint8) ^ ctr_keystream(key, nonce, offset, len(data))).tobytes()
+
+def encrypt_ctr(data, key_bytes, nonce, offset=0, workers=None):
+    """XOR `data` with the CTR keystream starting at byte `offset` of the stream.
+
+    Encryption and decryption are the same operation, and any byte range can
+    be processed on its own by passing its stream offset.  Large inputs are
+    split into fixed segments that are spread over `workers` processes; the
+    result does not depend on the worker count.
+    """
+    if len(key_bytes) != 16:
+        raise ValueError("Key must be 16 bytes.")
+    if offset < 0:
+        raise ValueError("Offset must be non-negative.")
+    data = memoryview(data).cast("B")
+    key_bytes = bytes(key_bytes)
+    nonce = bytes(nonce)
+    _initial_counter(nonce)
+    if workers is None:
+        workers = os.cpu_count() if len(data) >= CTR_PARALLEL_THRESHOLD else 1
+    segment = CTR_SEGMENT_BLOCKS * 16
+    # Segment boundaries follow absolute stream offsets so every segment after
+    # the first starts on a block boundary.
+    bounds = [0]
+    next_edge = (offset // segment + 1) * segment - offset
+    while next_edge < len(data):
+        bounds.append(next_edge)
+        next_edge += segment
+    bounds.append(len(data))
+    tasks = ((key_bytes, nonce, offset + lo, data[lo:hi].tobytes())
+             for lo, hi in zip(bounds, bounds[1:]))
+    if workers <= 1 or len(bounds) <= 2:
+        return b"".join(map(_ctr_segment, tasks))
+    # Keep at most CTR_WINDOW segments per worker in flight, so the copies
+    # handed to the pool stay bounded however large `data` is.
+    parts = []
+    pending = deque()
+    with mp.Pool(processes=workers) as pool:
+        for task in tasks:
+            if len(pending) >= CTR_WINDOW * workers:
+                parts.append(pending.popleft().get())
+            pending.append(pool.apply_async(_ctr_segment, (task,)))
+        parts.extend(result.get() for result in pending)
+    return b"".join(parts)
+
+decrypt_ctr = encrypt_ctr
 
 if __name__ == "__main__":
     import binascii
@@ -157,5 +684,6 @@ if __name__ == "__main__":
 
     ciphertext = encrypt_ecb(plaintext.encode('utf-8'), key)
     print("Ciphertext (hex):", ciphertext.hex())
-    
-    # Decrypting is not implemented in this snippet, but you can implement it similarly.
\ No newline at end of file
+
+    decrypted = decrypt_ecb(ciphertext, key)
+    print("Decrypted:", decrypted.decode('utf-8'))
\ No newline at end of file
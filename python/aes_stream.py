@@ -0,0 +1,164 @@
+# Streaming AES-128 encryption with bounded memory
+# Input is consumed in fixed-size chunks and every chunk is encrypted into a
+# preallocated output buffer, so memory use does not grow with the input.
+
+import mmap
+import os
+
+import numpy as np
+
+from aes128 import aes_decrypt_batch, aes_encrypt_batch, ctr_keystream, unpad_pkcs7
+
+STREAM_CHUNK = 1 << 20  # bytes, multiple of 16
+
+def _fill(view, source):
+    """Read from `source` until `view` is full or EOF; returns the byte count."""
+    filled = 0
+    while filled < len(view):
+        n = source.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+def iter_chunks(source, chunk_size=STREAM_CHUNK):
+    """Yield memoryviews of exactly `chunk_size` bytes, the last one possibly shorter.
+
+    `source` may be any bytes-like object or mmap (sliced without copying), a
+    binary file object (read into one reused buffer) or an iterable of
+    bytes-like pieces (regrouped through one reused buffer).  A yielded view
+    is only valid until the next one is requested.
+    """
+    if chunk_size <= 0 or chunk_size % 16:
+        raise ValueError("chunk_size must be a positive multiple of 16.")
+    try:
+        data = memoryview(source)
+    except TypeError:
+        data = None
+    if data is not None:
+        # array.array, NumPy arrays and other buffers are sliced like bytes;
+        # non-contiguous buffers are copied once
+        data = data.cast("B") if data.c_contiguous else memoryview(data.tobytes())
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+        return
+    buf = memoryview(bytearray(chunk_size))
+    if hasattr(source, "readinto"):
+        while True:
+            n = _fill(buf, source)
+            if n:
+                yield buf[:n]
+            if n < chunk_size:
+                return
+    filled = 0
+    for piece in source:
+        piece = memoryview(piece).cast("B")
+        while len(piece):
+            take = min(chunk_size - filled, len(piece))
+            buf[filled:filled + take] = piece[:take]
+            filled += take
+            piece = piece[take:]
+            if filled == chunk_size:
+                yield buf
+                filled = 0
+    if filled:
+        yield buf[:filled]
+
+def _blocks(view):
+    return np.frombuffer(view, dtype=np.uint8).reshape(-1, 16)
+
+def iter_encrypt(source, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Yield ciphertext chunks for `source`; ECB applies PKCS#7 to the final chunk only.
+
+    Yielded memoryviews share one output buffer and are only valid until the
+    next chunk is requested.
+    """
+    out = bytearray(chunk_size + 16)
+    out_np = np.frombuffer(out, dtype=np.uint8)
+    view = memoryview(out)
+    if mode == "ctr":
+        yield from _iter_ctr(source, key, nonce, chunk_size, out_np, view)
+        return
+    if mode != "ecb":
+        raise ValueError("mode must be 'ecb' or 'ctr'")
+    tail = b""
+    for chunk in iter_chunks(source, chunk_size):
+        full = len(chunk) - len(chunk) % 16
+        if full:
+            aes_encrypt_batch(_blocks(chunk[:full]), key, out=out_np[:full].reshape(-1, 16))
+        tail = bytes(chunk[full:])
+        if len(chunk) < chunk_size:
+            break
+        yield view[:full]
+    else:
+        full = 0
+    pad_len = 16 - len(tail)
+    last = np.frombuffer(tail + bytes([pad_len]) * pad_len, dtype=np.uint8).reshape(1, 16)
+    aes_encrypt_batch(last, key, out=out_np[full:full + 16].reshape(1, 16))
+    yield view[:full + 16]
+
+def _iter_ctr(source, key, nonce, chunk_size, out_np, view):
+    if nonce is None:
+        raise ValueError("CTR mode needs a nonce.")
+    offset = 0
+    for chunk in iter_chunks(source, chunk_size):
+        n = len(chunk)
+        np.bitwise_xor(np.frombuffer(chunk, dtype=np.uint8), ctr_keystream(key, nonce, offset, n),
+                       out=out_np[:n])
+        offset += n
+        yield view[:n]
+
+def iter_decrypt(source, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Inverse of iter_encrypt; ECB holds back the last block until EOF to strip padding."""
+    out = bytearray(chunk_size + 16)
+    out_np = np.frombuffer(out, dtype=np.uint8)
+    view = memoryview(out)
+    if mode == "ctr":
+        yield from _iter_ctr(source, key, nonce, chunk_size, out_np, view)
+        return
+    if mode != "ecb":
+        raise ValueError("mode must be 'ecb' or 'ctr'")
+    held = 0  # plaintext bytes kept at the start of `out` from the previous chunk
+    for chunk in iter_chunks(source, chunk_size):
+        if len(chunk) % 16:
+            raise ValueError("Ciphertext length must be a multiple of 16 bytes.")
+        n = len(chunk)
+        aes_decrypt_batch(_blocks(chunk), key, out=out_np[held:held + n].reshape(-1, 16))
+        total = held + n
+        yield view[:total - 16]
+        out[:16] = out[total - 16:total]
+        held = 16
+    if not held:
+        raise ValueError("Invalid padding")
+    yield memoryview(unpad_pkcs7(bytes(out[:16])))
+
+def encrypt_stream(source, dest, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Encrypt `source` into the writable `dest`; returns the number of bytes written."""
+    written = 0
+    for chunk in iter_encrypt(source, key, mode, nonce, chunk_size):
+        dest.write(chunk)
+        written += len(chunk)
+    return written
+
+def decrypt_stream(source, dest, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Decrypt `source` into the writable `dest`; returns the number of bytes written."""
+    written = 0
+    for chunk in iter_decrypt(source, key, mode, nonce, chunk_size):
+        dest.write(chunk)
+        written += len(chunk)
+    return written
+
+def _process_file(func, src_path, dst_path, key, mode, nonce, chunk_size):
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        if os.fstat(src.fileno()).st_size == 0:
+            return func(b"", dst, key, mode, nonce, chunk_size)
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return func(mm, dst, key, mode, nonce, chunk_size)
+
+def encrypt_file(src_path, dst_path, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Encrypt a file on disk through a read-only mmap of the input."""
+    return _process_file(encrypt_stream, src_path, dst_path, key, mode, nonce, chunk_size)
+
+def decrypt_file(src_path, dst_path, key, mode="ecb", nonce=None, chunk_size=STREAM_CHUNK):
+    """Decrypt a file on disk through a read-only mmap of the input."""
+    return _process_file(decrypt_stream, src_path, dst_path, key, mode, nonce, chunk_size)
@@ -1,42 +1,76 @@
+import multiprocessing as mp
+import sys
+
 import numpy as np
-import galois
-from itertools import product
+from gf256 import gf_mul, mul_table
+from gf2 import batch_rank
 
 # Define GF(2^8) with the irreducible polynomial 0x1f5 = x^8 + x^7 + x^6 + x^4 + x^2 + x + 1
-primitive_poly = galois.Poly.Int(0x1f5)
-GF256 = galois.GF(2**8, irreducible_poly=primitive_poly)
+POLY = 0x1f5
 
 # Function to create isomorphism matrix X from (y, z, w)
 def generate_basis_matrix(y, z, w):
     """
-    Construct the transformation matrix X ∈ GF(2)^{8x8} 
+    Construct the transformation matrix X ∈ GF(2)^{8x8}
     using a composite basis with basis elements (1, y, z, yz, w, yw, zw, yzw)
     """
-    base_elements = [1, y, z, y*z, w, y*w, z*w, y*z*w]
+    yz = gf_mul(y, z, POLY)
+    base_elements = [1, y, z, yz, w, gf_mul(y, w, POLY), gf_mul(z, w, POLY), gf_mul(yz, w, POLY)]
     matrix = np.array([[int(b >> (7 - i)) & 1 for b in base_elements] for i in range(8)], dtype=int)
     return matrix
 
-# Brute-force all (y, z, w) in GF(2^8)\{0}
-nonzero_elements = [e for e in GF256.elements if e != 0]
+# Each matrix is packed as its 8 columns, one uint8 per basis element, so a
+# batch of matrices is an (N, 8) uint8 array.
+NONZERO = np.arange(1, 256)
+
+def basis_columns(y):
+    """Packed matrices for (y, z, w) over every nonzero z, w; shape (255 * 255, 8)."""
+    table = mul_table(POLY)
+    z = NONZERO[:, None]
+    w = NONZERO[None, :]
+    yz = table[y, z]
+    columns = [np.ones_like(yz), np.full_like(yz, y), z, yz, w, table[y, w], table[z, w], table[yz, w]]
+    return np.stack([np.broadcast_to(c, (255, 255)) for c in columns], axis=-1).astype(np.uint8).reshape(-1, 8)
+
+def valid_pairs(y):
+    """(y, z, w-pairs) with full-rank basis matrices for one y."""
+    full = batch_rank(basis_columns(y)) == 8
+    z, w = np.divmod(np.flatnonzero(full), 255)
+    return y, np.stack([z + 1, w + 1], axis=1).astype(np.uint8)
 
-valid_triplets = []
+def main():
+    import argparse
 
-# Limit to 10 valid results for brevity
-max_results = 3
-count = 0
+    parser = argparse.ArgumentParser(description="Enumerate (y, z, w) with a full-rank composite basis")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--output", help="stream every valid triplet to this file ('-' for stdout)")
+    parser.add_argument("--show", type=int, default=10, help="number of triplets to print")
+    args = parser.parse_args()
 
-for y, z, w in product(nonzero_elements, repeat=3):
+    out = None
+    if args.output == "-":
+        out = sys.stdout
+    elif args.output:
+        out = open(args.output, "w")
+    total = 0
+    shown = []
     try:
-        X = generate_basis_matrix(y, z, w)
-        if np.linalg.matrix_rank(X) == 8:
-            valid_triplets.append((int(y), int(z), int(w)))
-            count += 1
-            if count >= max_results:
-                break
-    except Exception as e:
-        continue
-
-# Print a few valid triplets
-print(f"Total valid triplets: {len(valid_triplets)}")
-for i, (y, z, w) in enumerate(valid_triplets[:10]):
-    print(f"{i+1}. y=0x{y:02x}, z=0x{z:02x}, w=0x{w:02x}")
+        with mp.Pool(args.workers) as pool:
+            for y, pairs in pool.imap(valid_pairs, range(1, 256)):
+                total += len(pairs)
+                if out is not None:
+                    out.writelines(f"0x{y:02x} 0x{z:02x} 0x{w:02x}\n" for z, w in pairs.tolist())
+                for z, w in pairs[:args.show - len(shown)].tolist():
+                    shown.append((y, z, w))
+                print(f"y=0x{y:02x}: {len(pairs)} valid, running total {total}", file=sys.stderr)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+
+    # Print a few valid triplets
+    print(f"Total valid triplets: {total} of {255 ** 3}")
+    for i, (y, z, w) in enumerate(shown):
+        print(f"{i+1}. y=0x{y:02x}, z=0x{z:02x}, w=0x{w:02x}")
+
+if __name__ == "__main__":
+    main()
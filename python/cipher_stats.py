@@ -0,0 +1,112 @@
+# Single-pass cipher statistics runner
+# Random plaintexts are generated and encrypted once per chunk, and every
+# estimator of the test scripts updates from that shared sample.  Chunk i
+# draws from the i-th child of one SeedSequence, so results depend only on
+# the seed and the chunk size, not on the number of worker processes.
+# Estimators are merged in chunk order and reported as JSON.
+
+import json
+import multiprocessing as mp
+import sys
+import time
+
+import numpy as np
+
+from aes128 import aes_encrypt_batch
+from AvalancheEffectTest import AvalancheAccumulator, SACAccumulator
+from DifferentialDistributionTest import DifferentialAccumulator, DifferentialHistogramAccumulator
+from LinearApproximationBiasTest import LinearBiasAccumulator, LinearCorrelationAccumulator
+from ShannonEntropyTest import EntropyAccumulator
+
+DEFAULT_KEY = [0x2b, 0x7e, 0x15, 0x16,
+               0x28, 0xae, 0xd2, 0xa6,
+               0xab, 0xf7, 0x15, 0x88,
+               0x09, 0xcf, 0x4f, 0x3c]
+
+STATS_CHUNK = 1 << 16
+
+# name -> (accumulator class, keyword arguments)
+SUITE = {
+    "avalanche_plaintext": (AvalancheAccumulator, {"flip_target": "plaintext"}),
+    "avalanche_key": (AvalancheAccumulator, {"flip_target": "key"}),
+    # 128 extra encryptions per base input, so only part of each chunk is used
+    "sac_plaintext": (SACAccumulator, {"flip_target": "plaintext", "max_per_chunk": 256}),
+    "sac_key": (SACAccumulator, {"flip_target": "key", "max_per_chunk": 256}),
+    "entropy": (EntropyAccumulator, {}),
+    "differential": (DifferentialAccumulator, {"diff_pos": 0}),
+    "differential_histograms": (DifferentialHistogramAccumulator, {"max_per_chunk": 256}),
+    "linear_bias": (LinearBiasAccumulator, {}),
+    "linear_correlation": (LinearCorrelationAccumulator, {}),
+}
+
+def make_accumulators(suite=SUITE):
+    return {name: cls(**kwargs) for name, (cls, kwargs) in suite.items()}
+
+def _run_chunk(task):
+    seed, n, key, suite = task
+    rng = np.random.default_rng(seed)
+    plaintexts = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    ciphertexts = aes_encrypt_batch(plaintexts, key)
+    accumulators = make_accumulators(suite)
+    for acc in accumulators.values():
+        acc.update(plaintexts, ciphertexts, key, rng)
+    return accumulators
+
+def run_stats(samples, key=DEFAULT_KEY, seed=0, chunk_size=STATS_CHUNK, workers=None,
+              suite=SUITE, on_chunk=None):
+    """Run every estimator of `suite` over `samples` random blocks; returns merged accumulators."""
+    sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, n, list(key), suite) for s, n in zip(seeds, sizes)]
+    merged = make_accumulators(suite)
+    if workers == 1:
+        results = map(_run_chunk, tasks)
+        pool = None
+    else:
+        pool = mp.Pool(workers or mp.cpu_count())
+        results = pool.imap(_run_chunk, tasks)
+    try:
+        for i, accumulators in enumerate(results):
+            for name, acc in accumulators.items():
+                merged[name].merge(acc)
+            if on_chunk:
+                on_chunk(i + 1, len(tasks))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return merged
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cipher statistics from one shared random sample")
+    parser.add_argument("--samples", type=int, default=10 ** 6, help="number of random plaintext blocks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--key", default=bytes(DEFAULT_KEY).hex(), help="16-byte key in hex")
+    parser.add_argument("--chunk-size", type=int, default=STATS_CHUNK)
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    key = list(bytes.fromhex(args.key))
+    if len(key) != 16:
+        parser.error("key must be 16 bytes")
+    start = time.perf_counter()
+    merged = run_stats(args.samples, key, args.seed, args.chunk_size, args.workers,
+                       on_chunk=lambda done, total: print(f"chunk {done}/{total}", file=sys.stderr))
+    report = {
+        "config": {"samples": args.samples, "seed": args.seed, "key": args.key,
+                   "chunk_size": args.chunk_size},
+        "elapsed_seconds": time.perf_counter() - start,
+        "results": {name: acc.result() for name, acc in merged.items()},
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
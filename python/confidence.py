@@ -0,0 +1,69 @@
+# Normal-approximation confidence intervals for the cipher statistics
+# Estimators keep only sums, so they merge across chunks by addition and
+# report their intervals at the end.
+
+import math
+
+Z95 = 1.959963984540054
+
+def mean_interval(n, total, total_sq, z=Z95):
+    """(mean, low, high) of a sample given its count, sum and sum of squares."""
+    if n == 0:
+        return math.nan, math.nan, math.nan
+    mean = total / n
+    var = max(total_sq / n - mean * mean, 0.0) * n / max(n - 1, 1)
+    half = z * math.sqrt(var / n)
+    return mean, mean - half, mean + half
+
+def proportion_interval(k, n, z=Z95):
+    """(p, low, high) for k successes out of n trials (Wald interval)."""
+    if n == 0:
+        return math.nan, math.nan, math.nan
+    p = k / n
+    half = z * math.sqrt(p * (1 - p) / n)
+    return p, max(p - half, 0.0), min(p + half, 1.0)
+
+def chi_square_sf(x, df):
+    """P[X >= x] for a chi-square variable, by the Wilson-Hilferty approximation (large df)."""
+    if df <= 0:
+        return math.nan
+    h = 2 / (9 * df)
+    z = ((x / df) ** (1 / 3) - (1 - h)) / math.sqrt(h)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def gamma_q(a, x):
+    """Regularized upper incomplete gamma Q(a, x) (igamc), by series or continued fraction."""
+    if x < 0 or a <= 0:
+        raise ValueError("gamma_q needs a > 0 and x >= 0")
+    if x == 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        ap = a
+        for _ in range(10000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    # Lentz's method for the continued fraction
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
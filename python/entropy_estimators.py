@@ -0,0 +1,146 @@
+# Multi-order entropy estimators over mergeable histograms
+# Histograms are filled with np.bincount over chunked uint8/uint16/uint32
+# views and merged by addition, so workers can each count a share of the
+# sample and one process computes the estimates.  8- and 16-bit symbols use
+# dense histograms of fixed size.  32-bit windows (2^32 bins) are hashed
+# into a fixed number of bins and only their collision (Renyi order-2)
+# entropy is estimated, so memory stays bounded whatever the sample size.
+
+import math
+
+import numpy as np
+
+# ----------- Estimators over counts along the last axis ------------
+def shannon_entropy(counts):
+    """Plug-in (maximum likelihood) Shannon entropy in bits."""
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum(axis=-1, keepdims=True)
+    p = np.divide(counts, n, out=np.zeros_like(counts), where=n > 0)
+    logs = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    return -(p * logs).sum(axis=-1)
+
+def miller_madow_entropy(counts):
+    """Plug-in entropy plus the Miller-Madow bias correction (K - 1) / (2 n ln 2)."""
+    counts = np.asarray(counts)
+    n = counts.sum(axis=-1)
+    k = (counts > 0).sum(axis=-1)
+    return shannon_entropy(counts) + (k - 1) / (2 * np.maximum(n, 1) * math.log(2))
+
+def min_entropy(counts):
+    """-log2 of the most likely symbol's frequency."""
+    counts = np.asarray(counts, dtype=np.float64)
+    return -np.log2(counts.max(axis=-1) / counts.sum(axis=-1))
+
+def estimates(counts, bits):
+    """JSON-ready estimates of one histogram of `bits`-bit symbols, or of a stack of them."""
+    counts = np.asarray(counts)
+    return {
+        "symbol_bits": bits,
+        "samples": int(counts.sum(axis=-1).max()),
+        "shannon": shannon_entropy(counts).tolist(),
+        "miller_madow": miller_madow_entropy(counts).tolist(),
+        "min_entropy": min_entropy(counts).tolist(),
+    }
+
+# ----------- Histograms ------------
+class StreamHistogram:
+    """Overlapping order-k byte tuples (k = 1 or 2) of a byte stream, carried across chunks."""
+
+    def __init__(self, order=1):
+        if order not in (1, 2):
+            raise ValueError("order must be 1 (bytes) or 2 (byte pairs)")
+        self.order = order
+        self.counts = np.zeros(1 << (8 * order), dtype=np.int64)
+        self.carry = np.zeros(0, dtype=np.uint8)
+
+    def update(self, data):
+        data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.ravel()
+        if self.order == 1:
+            self.counts += np.bincount(data, minlength=256)
+            return
+        data = np.concatenate([self.carry, data])
+        if len(data) >= 2:
+            pairs = (data[:-1].astype(np.uint16) << 8) | data[1:]
+            self.counts += np.bincount(pairs, minlength=1 << 16)
+        self.carry = data[-1:].copy()
+
+    def merge(self, other):
+        # pairs straddling the two streams are not counted
+        self.counts += other.counts
+
+    def result(self):
+        return estimates(self.counts, 8 * self.order)
+
+class BlockPositionHistogram:
+    """Histograms of the 8- or 16-bit window starting at each byte position of 16-byte blocks."""
+
+    def __init__(self, window_bits=8):
+        if window_bits not in (8, 16):
+            raise ValueError("window_bits must be 8 or 16; use WindowCollisionEstimator for 32")
+        self.window_bits = window_bits
+        self.positions = 17 - window_bits // 8
+        self.bins = 1 << window_bits
+        self.counts = np.zeros((self.positions, self.bins), dtype=np.int64)
+
+    def update(self, blocks):
+        blocks = np.asarray(blocks, dtype=np.uint8).reshape(-1, 16)
+        if self.window_bits == 8:
+            values = blocks.astype(np.int64)
+        else:
+            values = (blocks[:, :-1].astype(np.int64) << 8) | blocks[:, 1:]
+        index = np.arange(self.positions) * self.bins + values
+        self.counts += np.bincount(index.ravel(), minlength=self.positions * self.bins).reshape(self.counts.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def result(self):
+        return estimates(self.counts, self.window_bits)
+
+class WindowCollisionEstimator:
+    """Collision entropy of the 32-bit window at each of the 13 byte positions of 16-byte blocks.
+
+    Windows are mixed by the MurmurHash3 finalizer and cut to 2^hash_bits
+    bins.  For a random hash into M bins the bin collision probability is
+    P + (1 - P) / M, where P is the collision probability of the windows
+    themselves, so P and H2 = -log2(P) are recovered from the bin counts.
+    The bin noise limits P to about 2 sqrt(2 / M) / n; estimates beyond that
+    are reported as resolution_bits, a lower bound on H2.
+    """
+
+    positions = 13
+
+    def __init__(self, hash_bits=16):
+        self.hash_bits = hash_bits
+        self.counts = np.zeros((self.positions, 1 << hash_bits), dtype=np.uint32)
+
+    @staticmethod
+    def _mix(h):
+        h = h ^ (h >> np.uint32(16))
+        h = h * np.uint32(0x85EBCA6B)
+        h ^= h >> np.uint32(13)
+        h *= np.uint32(0xC2B2AE35)
+        return h ^ (h >> np.uint32(16))
+
+    def update(self, blocks):
+        words = np.asarray(blocks, dtype=np.uint8).reshape(-1, 16).astype(np.uint32)
+        bins = self.counts.shape[1]
+        for j in range(self.positions):
+            w = (words[:, j] << 24) | (words[:, j + 1] << 16) | (words[:, j + 2] << 8) | words[:, j + 3]
+            h = self._mix(w) >> np.uint32(32 - self.hash_bits)
+            self.counts[j] += np.bincount(h, minlength=bins).astype(np.uint32)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def result(self):
+        counts = self.counts.astype(np.float64)
+        n = counts[0].sum()
+        m = counts.shape[1]
+        binned = (counts * (counts - 1)).sum(axis=1) / max(n * (n - 1), 1.0)
+        p = (binned - 1 / m) / (1 - 1 / m)
+        resolution = min(-math.log2(2 * math.sqrt(2 / m) / max(n, 1)), 32.0)
+        h2 = np.minimum(-np.log2(np.maximum(p, 2.0 ** -resolution)), resolution)
+        return {"symbol_bits": 32, "samples": int(n), "hash_bits": self.hash_bits,
+                "binned_collision_rate": binned.tolist(), "collision_entropy": h2.tolist(),
+                "resolution_bits": resolution}
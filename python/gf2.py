@@ -0,0 +1,107 @@
+# Linear algebra over GF(2) on bit-packed rows
+# A matrix is a list of int row masks: bit j of rows[i] is entry (i, j), so
+# y = M x sets bit i of y to the parity of rows[i] & x.  Linear maps on bytes
+# compile to 256-entry lookup tables, which apply to NumPy arrays in one
+# gather.
+
+import numpy as np
+
+# Linear part of the Rijndael S-box affine layer, as row masks
+AFFINE_MATRIX = [
+    0xF1,  # 11110001
+    0xE3,  # 11100011
+    0xC7,  # 11000111
+    0x8F,  # 10001111
+    0x1F,  # 00011111
+    0x3E,  # 00111110
+    0x7C,  # 01111100
+    0xF8   # 11111000
+]
+
+def pack_rows(matrix):
+    """Row masks of a 0/1 matrix (any nested sequence or array)."""
+    return [sum(int(bit & 1) << j for j, bit in enumerate(row)) for row in np.asarray(matrix)]
+
+def unpack_rows(rows, ncols=8):
+    return np.array([[(r >> j) & 1 for j in range(ncols)] for r in rows], dtype=np.uint8)
+
+def columns_to_rows(columns, bits=8):
+    """Row masks of the matrix whose column j is the bit vector columns[j]."""
+    return [sum(((c >> i) & 1) << j for j, c in enumerate(columns)) for i in range(bits)]
+
+def rows_to_columns(rows, ncols=8):
+    return [sum(((r >> j) & 1) << i for i, r in enumerate(rows)) for j in range(ncols)]
+
+def linear_rows(func, bits=8):
+    """Matrix of the linear map `func` on `bits`-bit integers."""
+    return columns_to_rows([func(1 << j) for j in range(bits)], bits)
+
+def identity(n=8):
+    return [1 << i for i in range(n)]
+
+def matvec(rows, x):
+    y = 0
+    for i, r in enumerate(rows):
+        y |= (bin(r & x).count("1") & 1) << i
+    return y
+
+def matmul(a, b):
+    """Product a·b."""
+    out = []
+    for row in a:
+        acc = 0
+        j = 0
+        while row:
+            if row & 1:
+                acc ^= b[j]
+            row >>= 1
+            j += 1
+        out.append(acc)
+    return out
+
+def rank(rows):
+    basis = []  # kept sorted by decreasing leading bit
+    for r in rows:
+        for b in basis:
+            r = min(r, r ^ b)
+        if r:
+            basis.append(r)
+            basis.sort(reverse=True)
+    return len(basis)
+
+def inverse(rows):
+    """Inverse of a square matrix by Gauss-Jordan elimination; ValueError if singular."""
+    n = len(rows)
+    rows = [(r, 1 << i) for i, r in enumerate(rows)]
+    for col in range(n):
+        pivot = next((i for i in range(col, n) if (rows[i][0] >> col) & 1), None)
+        if pivot is None:
+            raise ValueError("Matrix is singular over GF(2)")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        pr, pi = rows[col]
+        rows = [(r ^ pr, i ^ pi) if k != col and (r >> col) & 1 else (r, i)
+                for k, (r, i) in enumerate(rows)]
+    return [i for _, i in rows]
+
+def to_lut(rows, constant=0, bits=8):
+    """uint8/uint16 table of x -> M x ^ constant for every `bits`-bit x."""
+    columns = rows_to_columns(rows, bits)
+    dtype = np.uint8 if len(rows) <= 8 else np.uint16
+    lut = np.zeros(1 << bits, dtype=dtype)
+    for j, c in enumerate(columns):
+        lut[1 << j:2 << j] = lut[:1 << j] ^ c
+    return lut ^ dtype(constant)
+
+def batch_rank(columns):
+    """GF(2) rank of each 8x8 matrix in a batch packed as (N, 8) uint8 columns."""
+    m = np.array(columns, dtype=np.uint8)
+    index = np.arange(len(m))
+    result = np.zeros(len(m), dtype=np.int8)
+    for bit in range(7, -1, -1):
+        has_bit = ((m >> bit) & 1).astype(bool)
+        found = has_bit.any(axis=1)
+        pivot = m[index, has_bit.argmax(axis=1)]
+        # XOR the pivot into every column with this bit, the pivot column itself included
+        m ^= np.where(has_bit, pivot[:, None], 0).astype(np.uint8)
+        result += found
+    return result
@@ -0,0 +1,102 @@
+# Table-driven GF(2^8) arithmetic for any irreducible polynomial
+# Log/antilog, inverse and (optionally) full multiplication tables are built
+# once per polynomial and shared as read-only NumPy arrays.
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+AES_POLY = 0x11B
+
+# 30 irreducible polynomials of degree 8 used by the S-box searches
+POLY_LIST = [
+    0x11b, 0x11d, 0x12b, 0x12d, 0x139, 0x13f, 0x14d, 0x15f, 0x163, 0x165,
+    0x169, 0x171, 0x177, 0x17b, 0x187, 0x18b, 0x18d, 0x19f, 0x1a3, 0x1a9,
+    0x1b1, 0x1bd, 0x1c3, 0x1cf, 0x1d7, 0x1dd, 0x1e7, 0x1f3, 0x1f5, 0x1f9
+]
+
+def mul_bitserial(a, b, poly):
+    """Shift-and-add multiplication, used only to bootstrap the tables."""
+    result = 0
+    for _ in range(8):
+        if b & 1:
+            result ^= a
+        a <<= 1
+        if a & 0x100:
+            a ^= poly
+        b >>= 1
+    return result
+
+class GF256(NamedTuple):
+    poly: int
+    generator: int
+    exp: np.ndarray  # uint8[510], exp[i] = generator^i, doubled to skip a modulo
+    log: np.ndarray  # int16[256], log[0] = -1
+    inv: np.ndarray  # uint8[256], inv[0] = 0
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+@lru_cache(maxsize=None)
+def get_field(poly=AES_POLY):
+    """Return the memoized tables of GF(2^8) modulo `poly`."""
+    if not 0x100 <= poly <= 0x1FF:
+        raise ValueError(f"Polynomial 0x{poly:x} is not of degree 8")
+    for g in range(2, 256):
+        powers = [1]
+        for _ in range(254):
+            powers.append(mul_bitserial(powers[-1], g, poly))
+        if len(set(powers)) == 255:
+            break
+    else:
+        raise ValueError(f"Polynomial 0x{poly:x} is not irreducible")
+    exp = np.array(powers + powers, dtype=np.uint8)
+    log = np.full(256, -1, dtype=np.int16)
+    log[exp[:255]] = np.arange(255, dtype=np.int16)
+    inv = np.zeros(256, dtype=np.uint8)
+    inv[1:] = exp[(255 - log[1:]) % 255]
+    return GF256(poly, g, _readonly(exp), _readonly(log), _readonly(inv))
+
+@lru_cache(maxsize=None)
+def _lists(poly):
+    field = get_field(poly)
+    return field.exp.tolist(), field.log.tolist(), field.inv.tolist()
+
+@lru_cache(maxsize=8)
+def mul_table(poly=AES_POLY):
+    """Full 256x256 uint8 multiplication table (64 KiB) for `poly`."""
+    field = get_field(poly)
+    log = field.log.astype(np.intp)
+    table = field.exp[log[:, None] + log[None, :]]
+    table[0, :] = 0
+    table[:, 0] = 0
+    return _readonly(table)
+
+def inverse_table(poly=AES_POLY):
+    return get_field(poly).inv
+
+def gf_mul(a, b, poly=AES_POLY):
+    if a == 0 or b == 0:
+        return 0
+    exp, log, _ = _lists(poly)
+    return exp[log[a] + log[b]]
+
+def gf_inv(a, poly=AES_POLY):
+    """Multiplicative inverse, with 0 mapped to 0."""
+    return _lists(poly)[2][a]
+
+def gf_pow(a, e, poly=AES_POLY):
+    if a == 0:
+        return 1 if e == 0 else 0
+    exp, log, _ = _lists(poly)
+    return exp[(log[a] * e) % 255]
+
+def gf_mul_array(a, b, poly=AES_POLY):
+    """Element-wise product of uint8 arrays (broadcasting)."""
+    field = get_field(poly)
+    a = np.asarray(a, dtype=np.uint8)
+    b = np.asarray(b, dtype=np.uint8)
+    product = field.exp[field.log[a].astype(np.intp) + field.log[b]]
+    return np.where((a == 0) | (b == 0), np.uint8(0), product)
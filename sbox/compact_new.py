@@ -1,92 +1,144 @@
+import os
+import sys
 import numpy as np
 import multiprocessing as mp
 from typing import List, Tuple
 
-def gf_mul(a, b, poly):
-    result = 0
-    for _ in range(8):
-        if b & 1:
-            result ^= a
-        carry = a & 0x80
-        a <<= 1
-        if carry:
-            a ^= poly
-        a &= 0xFF
-        b >>= 1
-    return result
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+from gf256 import inverse_table
+from sbox_cache import DEFAULT_CACHE_DIR, SBoxCache
+from sbox_equivalence import classify, run_class_search
+from sbox_metrics import rank_key, sbox_metrics
+from sbox_search import (FULL_SPACE, SearchSpace, load_checkpoint, save_checkpoint,
+                         evaluate_sbox as evaluate_candidate, generate_sbox as generate_candidate)
 
-def compute_inv_table(poly: int) -> List[int]:
-    inv_table = [0] * 256
-    for a in range(1, 256):
-        t, newt, r, newr = 0, 1, poly, a
-        while newr != 0:
-            quotient = r // newr
-            t, newt = newt, t ^ gf_mul(quotient, newt, poly)
-            r, newr = newr, r ^ gf_mul(quotient, newr, poly)
-        inv_table[a] = t
-    return inv_table
+# ----------- PARALLEL SEARCH EXECUTOR ------------
+# Workers are initialized once: the field tables of every polynomial are
+# built in the pool initializer and the running top-K bound lives in shared
+# memory.  Tasks are just (start, stop) index ranges of the search space.
+NO_BOUND = (1 << 30, 1 << 30, -1)
 
-def affine_transform(byte, c=0x63):
-    result = 0
-    for i in range(8):
-        bit = (byte >> i) & 1
-        total = bit ^ ((byte >> ((i + 4) % 8)) & 1) ^ ((byte >> ((i + 5) % 8)) & 1) ^ \
-                ((byte >> ((i + 6) % 8)) & 1) ^ ((byte >> ((i + 7) % 8)) & 1) ^ ((c >> i) & 1)
-        result |= (total << i)
-    return result
+_worker = {}
 
-def generate_sbox(poly: int, M: int, c: int, inv_table: List[int]) -> List[int]:
-    return [affine_transform(gf_mul(inv_table[x], M, poly), c) if x != 0 else affine_transform(0, c) for x in range(256)]
+def _init_worker(space: SearchSpace, shared_bound, cache_dir):
+    for poly in space.polys:
+        inverse_table(poly)
+    _worker["space"] = space
+    _worker["bound"] = shared_bound
+    _worker["cache"] = SBoxCache(cache_dir) if cache_dir else None
 
-def get_ddt(sbox: List[int]) -> int:
-    ddt = np.zeros((256, 256), dtype=int)
-    for x in range(256):
-        for dx in range(256):
-            dy = sbox[x] ^ sbox[x ^ dx]
-            ddt[dx][dy] += 1
-    return np.max(ddt[1:])
+def _read_bound(shared_bound) -> Tuple[int, int, int]:
+    with shared_bound.get_lock():
+        return tuple(shared_bound)
 
-def get_lat(sbox: List[int]) -> int:
-    lat = np.zeros((256, 256), dtype=int)
-    for a in range(256):
-        for b in range(256):
-            lat[a, b] = sum((-1) ** (bin(a & x).count("1") ^ bin(b & sbox[x]).count("1")) for x in range(256))
-    lat[0][0] = 0
-    return np.max(np.abs(lat))
+def _evaluate_range(task):
+    start, stop = task
+    space = _worker["space"]
+    kept = []
+    for index in range(start, stop):
+        du, lu, worst_index = _read_bound(_worker["bound"])
+        # Equal scores are ranked by index, so a lower index may still tie in
+        bound = (du, lu) if index > worst_index else (du, lu + 1)
+        params = space.params(index)
+        score = evaluate_candidate(generate_candidate(*params), bound, _worker["cache"])
+        if score is not None:
+            kept.append((score, index, params))
+    cache = _worker["cache"]
+    return start, kept, None if cache is None else cache.pop_scores()
 
-def evaluate_sbox(sbox: List[int]) -> Tuple[int, int]:
-    return get_ddt(sbox), get_lat(sbox)
+def run_parallel_search(space: SearchSpace = FULL_SPACE, k: int = 10, workers: int = None,
+                        chunk_size: int = 256, checkpoint: str = None, on_update=None,
+                        cache_dir: str = None) -> List[dict]:
+    """Parallel version of sbox_search.run_search; returns the top-k entries, best first.
 
-def process_params(args):
-    poly, M, c, inv_table = args
-    sbox = generate_sbox(poly, M, c, inv_table)
-    du, lu = evaluate_sbox(sbox)
-    return (du, lu), sbox, (poly, M, c)
+    Chunks complete out of order, so the checkpoint records the first index
+    before which every chunk is done.  With `cache_dir`, S-boxes present in
+    that SBoxCache are scored from it, and workers send their new scores back
+    so this process writes them to the score store in batches.
+    """
+    next_index, top = load_checkpoint(checkpoint, space, k)
+    cache = SBoxCache(cache_dir) if cache_dir else None
+    shared_bound = mp.Array("q", top.worst() or NO_BOUND)
+    starts = range(next_index, len(space), chunk_size)
+    tasks = ((s, min(s + chunk_size, len(space))) for s in starts)
+    done = set()
+    with mp.Pool(processes=workers or mp.cpu_count(), initializer=_init_worker,
+                 initargs=(space, shared_bound, cache_dir)) as pool:
+        for start, kept, scores in pool.imap_unordered(_evaluate_range, tasks):
+            if cache is not None:
+                cache.add_scores(scores)
+            changed = False
+            for score, index, params in kept:
+                changed |= top.offer(score, index, params)
+            if changed:
+                with shared_bound.get_lock():
+                    shared_bound[:] = top.worst() or NO_BOUND
+                if on_update:
+                    on_update(top.entries())
+            done.add(start)
+            advanced = next_index in done
+            while next_index in done:
+                done.remove(next_index)
+                next_index = min(next_index + chunk_size, len(space))
+            if checkpoint and advanced:
+                save_checkpoint(checkpoint, space, top, next_index)
+    if cache is not None:
+        cache.flush_scores()
+    return top.entries()
 
-def run_parallel_search():
-    polyList = [
-        0x11b, 0x11d, 0x12b, 0x12d, 0x139, 0x13f, 0x14d, 0x15f, 0x163, 0x165,
-        0x169, 0x171, 0x177, 0x17b, 0x187, 0x18b, 0x18d, 0x19f, 0x1a3, 0x1a9,
-        0x1b1, 0x1bd, 0x1c3, 0x1cf, 0x1d7, 0x1dd, 0x1e7, 0x1f3, 0x1f5, 0x1f9
-    ]
+def rerank(entries: List[dict]) -> List[dict]:
+    """Order search results by (du, lu) and then by sbox_metrics.rank_key.
 
-    M_vals = list(range(1, 2))
-    c_vals = list(range(1, 2))
+    Each entry gains a "metrics" dict with the tie-breaking metrics.
+    """
+    sboxes = np.stack([generate_candidate(*entry["params"]) for entry in entries])
+    metrics = sbox_metrics(sboxes)
+    ranked = []
+    for i, entry in enumerate(entries):
+        entry = dict(entry, metrics={
+            "nonlinearity": int(metrics.nonlinearity[i]),
+            "algebraic_degree": int(metrics.algebraic_degree[i]),
+            "bic_nonlinearity": int(metrics.bic_nonlinearity[i]),
+            "sac": metrics.sac[i].round(4).tolist(),
+            "fixed_points": int(metrics.fixed_points[i]),
+            "opposite_fixed_points": int(metrics.opposite_fixed_points[i]),
+            "differential_branch_number": int(metrics.differential_branch_number[i]),
+        })
+        ranked.append((tuple(entry["score"]), rank_key(metrics, i), entry["index"], entry))
+    return [item[-1] for item in sorted(ranked, key=lambda item: item[:3])]
 
-    args_list = []
-    inv_tables = {poly: compute_inv_table(poly) for poly in polyList}
+def main():
+    import argparse
 
-    for poly in polyList[:1]:
-        inv_table = inv_tables[poly]
-        for M in M_vals:
-            for c in c_vals:
-                args_list.append((poly, M, c, inv_table))
+    parser = argparse.ArgumentParser(description="Parallel full-space compact S-box search")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=256, help="candidates per task")
+    parser.add_argument("--top", type=int, default=10, help="number of best candidates to keep")
+    parser.add_argument("--checkpoint", default="compact_new.ckpt.json",
+                        help="progress file; an interrupted search resumes from it")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="S-box property table cache")
+    parser.add_argument("--dedup", action="store_true",
+                        help="score one S-box per affine-equivalence class")
+    args = parser.parse_args()
 
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        results = pool.map(process_params, args_list)
+    if args.dedup:
+        classes = classify(FULL_SPACE)
+        print("Equivalence classes:", len(classes))
+        top = run_class_search(FULL_SPACE, k=args.top, classes=classes)
+    else:
+        top = run_parallel_search(FULL_SPACE, k=args.top, workers=args.workers,
+                                  chunk_size=args.chunk_size, checkpoint=args.checkpoint,
+                                  cache_dir=args.cache_dir)
+    top = rerank(top)
+    best = top[0]
+    best_sbox = generate_candidate(*best["params"])
+    analysis = SBoxCache(args.cache_dir).analyze(best_sbox)
+    print("Best score (DDT, LAT):", tuple(best["score"]))
+    print("Boomerang Uniformity of best S-box:", analysis.boomerang_uniformity)
+    print("Best S-box parameters (poly, M, c):", tuple(best["params"]))
+    print("Algebraic degree / BIC nonlinearity / fixed points:", best["metrics"]["algebraic_degree"],
+          best["metrics"]["bic_nonlinearity"], best["metrics"]["fixed_points"])
+    print("Best S-box (first 16 bytes):", best_sbox[:16].tolist())
 
-    best = min(results, key=lambda x: x[0])
-    return best
-
-best_score, best_sbox, best_params = run_parallel_search()
-best_score, best_params, best_sbox[:16]  # show sample output
+if __name__ == "__main__":
+    main()
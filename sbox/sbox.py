@@ -1,45 +1,21 @@
 import array
+import os
+import sys
 
-def gf_mul(a, b):
-    result = 0
-    for _ in range(8):
-        if b & 1:
-            result ^= a
-        hi_bit = a & 0x80
-        a = (a << 1) & 0xFF
-        if hi_bit:
-            a ^= 0x1B
-        b >>= 1
-    return result
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+from gf2 import AFFINE_MATRIX, to_lut
+from gf256 import AES_POLY, gf_inv
 
-def gf_inverse(byte):
-    """Find multiplicative inverse using brute force (valid for small field like GF(2^8))"""
-    if byte == 0:
-        return 0
-    for i in range(1, 256):
-        if gf_mul(byte, i) == 1:
-            return i
-    return 0
+# Affine layer with constant 0x63 as one lookup table
+AFFINE_LUT = to_lut(AFFINE_MATRIX, 0x63)
 
 def affine_transform(byte):
-    c = 0x63
-    result = 0
-    for i in range(8):
-        bit = (
-            ((byte >> i) & 1) ^
-            ((byte >> ((i + 4) % 8)) & 1) ^
-            ((byte >> ((i + 5) % 8)) & 1) ^
-            ((byte >> ((i + 6) % 8)) & 1) ^
-            ((byte >> ((i + 7) % 8)) & 1) ^
-            ((c >> i) & 1)
-        )
-        result |= (bit << i)
-    return result
+    return int(AFFINE_LUT[byte])
 
 def generate_sbox():
     sbox = []
     for i in range(256):
-        inv = gf_inverse(i)
+        inv = gf_inv(i, AES_POLY)
         sbox.append(affine_transform(inv))
     return sbox
 
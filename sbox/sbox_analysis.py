@@ -0,0 +1,130 @@
+# Vectorized S-box analysis tables (DDT, LAT, BCT)
+# The LAT comes from a fast Walsh-Hadamard transform of all 256 component
+# functions at once: O(256^2 * 8) additions instead of a 256^3 parity loop.
+# The DDT is one bincount over the 256x256 XOR grid, and the BCT is derived
+# from DDT solution sets.
+
+from typing import NamedTuple
+
+import numpy as np
+
+PARITY = np.array([bin(x).count("1") & 1 for x in range(256)], dtype=np.uint8)
+
+def as_sbox_array(sbox):
+    sbox = np.asarray(sbox, dtype=np.intp)
+    if sbox.shape[-1] != 256:
+        raise ValueError("S-Box must have 256 entries")
+    return sbox
+
+def fwht(values):
+    """Unnormalized Walsh-Hadamard transform along the last axis (length 256)."""
+    a = np.array(values, dtype=np.int32)
+    lead = a.shape[:-1]
+    n = a.shape[-1]
+    h = 1
+    while h < n:
+        a = a.reshape(lead + (n // (2 * h), 2, h))
+        x, y = a[..., 0, :], a[..., 1, :]
+        a = np.stack((x + y, x - y), axis=-2)
+        h *= 2
+    return a.reshape(lead + (n,))
+
+def walsh_table(sbox, output_masks=None):
+    """W[a, b] = sum_x (-1)^(a·x ^ b·S(x)), the table used by the compact scripts.
+
+    Works on a single S-box or a batch shaped (..., 256).  With
+    `output_masks` only those columns b are computed, in that order.
+    """
+    sbox = as_sbox_array(sbox)
+    b = np.arange(256) if output_masks is None else np.asarray(output_masks, dtype=np.intp)
+    b = b[:, None]
+    # signs[..., b, x] = (-1)^(b·S(x))
+    signs = 1 - 2 * PARITY[b & sbox[..., None, :]].astype(np.int32)
+    return np.swapaxes(fwht(signs), -1, -2)
+
+def lat_table(sbox):
+    """LAT with sec.py's bias convention: #{x : a·x = b·S(x)} - 128."""
+    return walsh_table(sbox) // 2
+
+class LinearProperties(NamedTuple):
+    lat: np.ndarray      # count - 128 convention
+    linearity: int       # max |W(a, b)| over (a, b) != (0, 0)
+    nonlinearity: int    # 128 - linearity / 2
+
+def linear_properties(sbox):
+    walsh = walsh_table(sbox)
+    linearity = linearity_from_walsh(walsh)
+    return LinearProperties(walsh // 2, linearity, 128 - linearity // 2)
+
+def linearity_from_walsh(walsh):
+    spectrum = np.abs(walsh)
+    spectrum[..., 0, 0] = 0
+    return int(spectrum.max())
+
+def ddt_table(sbox):
+    """DDT[dx, dy] = #{x : S(x) ^ S(x ^ dx) = dy}, for one S-box or a batch (..., 256)."""
+    sbox = as_sbox_array(sbox)
+    lead = sbox.shape[:-1]
+    flat = sbox.reshape(-1, 256)
+    x = np.arange(256)
+    dx = x[:, None]
+    dy = flat[:, None, :] ^ flat[:, dx ^ x]  # (batch, dx, x)
+    index = (np.arange(len(flat))[:, None, None] * 256 + dx) * 256 + dy
+    counts = np.bincount(index.ravel(), minlength=len(flat) * 65536)
+    return counts.reshape(lead + (256, 256))
+
+def inverse_sbox(sbox):
+    sbox = as_sbox_array(sbox)
+    if not np.array_equal(np.sort(sbox), np.arange(256)):
+        raise ValueError("S-Box must be a permutation")
+    return np.argsort(sbox)
+
+def bct_table(sbox):
+    """Boomerang connectivity table, BCT[a, b] as in sec.py's compute_bct.
+
+    With y = S(x), the boomerang returns exactly when S^-1(y) and S^-1(y ^ b)
+    fall in the same DDT solution set of input difference a.  So for each a
+    the outputs y are grouped by S(S^-1(y) ^ a) ^ y, and every pair inside a
+    group adds to column y ^ y'.  That costs sum(DDT[a]^2) per row instead
+    of 256^2 lookups.
+    """
+    sbox = as_sbox_array(sbox)
+    inv = inverse_sbox(sbox)
+    y = np.arange(256)
+    alpha = y[1:, None]
+    groups = y ^ sbox[inv[None, :] ^ alpha]  # output difference per (a, y)
+    order = np.argsort(groups, axis=1, kind="stable")
+    keys = np.take_along_axis(groups, order, axis=1)
+    bct = np.zeros((256, 256), dtype=np.int64)
+    bct[0, :] = 256
+    bct[:, 0] = 256
+    rows = np.broadcast_to(alpha, order.shape)
+    d = 1
+    while True:
+        same = keys[:, d:] == keys[:, :-d]
+        if not same.any():
+            break
+        beta = order[:, d:][same] ^ order[:, :-d][same]
+        bct[1:] += 2 * np.bincount((rows[:, d:][same] - 1) * 256 + beta, minlength=255 * 256).reshape(255, 256)
+        d += 1
+    return bct
+
+class SBoxAnalysis(NamedTuple):
+    ddt: np.ndarray
+    lat: np.ndarray
+    bct: np.ndarray
+    differential_uniformity: int  # max of DDT, excluding first row
+    linear_uniformity: int        # max absolute LAT, excluding row 0 & col 0
+    boomerang_uniformity: int     # max of BCT, excluding row 0 & col 0
+
+def analyze_sbox(sbox):
+    """DDT, LAT and BCT of `sbox` with the uniformity numbers sec.py reports."""
+    ddt = ddt_table(sbox)
+    lat = lat_table(sbox)
+    bct = bct_table(sbox)
+    return SBoxAnalysis(
+        ddt, lat, bct,
+        int(ddt[1:].max()),
+        int(np.abs(lat[1:, 1:]).max()),
+        int(bct[1:, 1:].max()),
+    )
@@ -0,0 +1,280 @@
+# Content-addressed on-disk cache of S-box property tables
+# Entries are keyed by the SHA-256 of the 256-byte S-box.  Each entry is a
+# directory of .npy tables (memory-mapped on load); summary metrics, sizes
+# and access times live in one small index.json used for LRU eviction.
+# Several processes may share a cache directory: every index change is made
+# under an exclusive flock on index.lock against a freshly read index.json.
+#
+# Search scores (du, linearity) of the millions of candidates a search
+# visits are too many for index.json, so they go to a separate store: the
+# scores/ directory holds .npy record arrays keyed by the first 64 bits of
+# the S-box hash, written in batches and merged in memory on load.
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from sbox_analysis import SBoxAnalysis, analyze_sbox, as_sbox_array
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SBOX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sbox-tables"))
+DEFAULT_MAX_BYTES = int(os.environ.get("SBOX_CACHE_MAX_BYTES", 1 << 30))
+
+# Stored dtypes: DDT/BCT entries are at most 256, LAT entries lie in [-128, 128]
+TABLES = {"ddt": np.uint16, "lat": np.int16, "bct": np.uint16}
+# Temporary entry directories older than this are left over from crashed writers
+STALE_TMP_SECONDS = 3600
+
+# One search score; `exact` is False when the search stopped early, and then
+# `lin` is only a lower bound on the linearity (0 if the LAT was skipped)
+SCORE_DTYPE = np.dtype([("key", "<u8"), ("du", "<u2"), ("lin", "<u2"), ("exact", "?")])
+SCORE_FLUSH = 1 << 16  # pending scores written per file
+SCORE_COMPACT = 64     # score files merged into one on load beyond this many
+
+def sbox_key(sbox) -> str:
+    return hashlib.sha256(as_sbox_array(sbox).astype(np.uint8).tobytes()).hexdigest()
+
+def score_key(sbox) -> int:
+    """First 64 bits of the S-box hash, the key of the score store."""
+    digest = hashlib.sha256(as_sbox_array(sbox).astype(np.uint8).tobytes()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def _merge_scores(records):
+    """One record per key, sorted by key; exact scores win over bounds, then larger bounds."""
+    if not len(records):
+        return np.zeros(0, dtype=SCORE_DTYPE)
+    order = np.lexsort((records["lin"], records["exact"], records["key"]))
+    records = records[order]
+    last = np.append(records["key"][1:] != records["key"][:-1], True)
+    return records[last]
+
+def _atomic_write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+class SBoxCache:
+    """DDT/LAT/BCT tables and uniformity metrics cached by S-box content."""
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(path, "index.json")
+        self.scores_path = os.path.join(path, "scores")
+        os.makedirs(self.scores_path, exist_ok=True)
+        self._index = self._load_index()
+        self._scores = self._load_scores()
+        self._pending = []
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextlib.contextmanager
+    def _locked_index(self):
+        """Yield the current on-disk index under the lock and write it back afterwards."""
+        with open(os.path.join(self.path, "index.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self._load_index()
+                yield index
+                _atomic_write_json(self.index_path, index)
+                self._index = index
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _touch(self, key):
+        with self._locked_index() as index:
+            if key in index:
+                index[key]["last_used"] = time.time()
+
+    def _forget(self, key):
+        with self._locked_index() as index:
+            index.pop(key, None)
+
+    def _score_files(self):
+        names = sorted(n for n in os.listdir(self.scores_path) if n.endswith(".npy"))
+        return [os.path.join(self.scores_path, n) for n in names]
+
+    def _load_scores(self):
+        files = self._score_files()
+        parts = []
+        for name in files:
+            try:
+                parts.append(np.load(name))
+            except (FileNotFoundError, ValueError):
+                pass  # evicted or merged by another process meanwhile
+        scores = _merge_scores(np.concatenate(parts) if parts else np.zeros(0, dtype=SCORE_DTYPE))
+        if len(files) > SCORE_COMPACT:
+            with self._locked_index():
+                self._write_scores(scores)
+                for name in files:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(name)
+        return scores
+
+    def _write_scores(self, records):
+        fd, tmp = tempfile.mkstemp(dir=self.scores_path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, records)
+        os.replace(tmp, os.path.join(self.scores_path, f"{time.time_ns():020d}-{os.getpid()}.npy"))
+
+    def score(self, sbox):
+        """Stored (du, linearity, exact) search score of `sbox`, or None."""
+        key = np.uint64(score_key(sbox))
+        i = np.searchsorted(self._scores["key"], key)
+        if i == len(self._scores) or self._scores["key"][i] != key:
+            return None
+        record = self._scores[i]
+        return int(record["du"]), int(record["lin"]), bool(record["exact"])
+
+    def record_score(self, sbox, du, lin, exact=True):
+        """Queue a search score; it is written by flush_scores()."""
+        self._pending.append((score_key(sbox), du, lin, exact))
+        if len(self._pending) >= SCORE_FLUSH:
+            self.flush_scores()
+
+    def pop_scores(self):
+        """Take the queued scores as a record array, e.g. to hand them to another process."""
+        records = np.array(self._pending, dtype=SCORE_DTYPE)
+        self._pending = []
+        return records
+
+    def add_scores(self, records):
+        self._pending.extend(records.tolist())
+        if len(self._pending) >= SCORE_FLUSH:
+            self.flush_scores()
+
+    def flush_scores(self):
+        """Write queued scores as one file of the score store."""
+        if not self._pending:
+            return
+        records = self.pop_scores()
+        with self._locked_index() as index:
+            self._write_scores(records)
+            self._evict(index)
+
+    def metrics(self, sbox):
+        """Summary metrics from the index only, or None if the S-box is not cached."""
+        entry = self._index.get(sbox_key(sbox))
+        return None if entry is None else entry["metrics"]
+
+    def get(self, sbox):
+        """Cached SBoxAnalysis with memory-mapped tables, or None."""
+        key = sbox_key(sbox)
+        entry = self._index.get(key)
+        if entry is None:
+            # May have been added by another process since the index was read
+            self._index = self._load_index()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+        try:
+            tables = [np.load(os.path.join(self.path, key, f"{name}.npy"), mmap_mode="r")
+                      for name in TABLES]
+        except FileNotFoundError:
+            # Evicted by another process sharing this directory
+            self._forget(key)
+            return None
+        self._touch(key)
+        m = entry["metrics"]
+        return SBoxAnalysis(*tables, m["differential_uniformity"], m["linear_uniformity"],
+                            m["boomerang_uniformity"])
+
+    def put(self, sbox, analysis: SBoxAnalysis):
+        key = sbox_key(sbox)
+        tmp = tempfile.mkdtemp(dir=self.path, prefix=key[:8] + "-", suffix=".tmp")
+        size = 0
+        for name, dtype in TABLES.items():
+            target = os.path.join(tmp, f"{name}.npy")
+            np.save(target, np.asarray(getattr(analysis, name)).astype(dtype))
+            size += os.path.getsize(target)
+        # max |W(a, b)| over (a, b) != (0, 0), with W = 2 * LAT
+        lat = np.abs(np.asarray(analysis.lat, dtype=np.int32))
+        lat[0, 0] = 0
+        linearity = 2 * int(lat.max())
+        with self._locked_index() as index:
+            final = os.path.join(self.path, key)
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(tmp, final)
+            index[key] = {
+                "metrics": {
+                    "differential_uniformity": analysis.differential_uniformity,
+                    "linear_uniformity": analysis.linear_uniformity,
+                    "boomerang_uniformity": analysis.boomerang_uniformity,
+                    "linearity": linearity,
+                    "nonlinearity": 128 - linearity // 2,
+                },
+                "size": size,
+                "last_used": time.time(),
+            }
+            self._evict(index)
+
+    def analyze(self, sbox) -> SBoxAnalysis:
+        """Return the cached analysis of `sbox`, computing and storing it on a miss."""
+        cached = self.get(sbox)
+        if cached is not None:
+            return cached
+        analysis = analyze_sbox(sbox)
+        self.put(sbox, analysis)
+        return analysis
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self._locked_index() as index:
+            self._evict(index)
+
+    def _evict(self, index):
+        # Directories missing from the index (lost by a crash or an older
+        # writer) are not counted in any size, so they are removed first
+        now = time.time()
+        for directory in (self.path, self.scores_path):
+            for name in os.listdir(directory):
+                full = os.path.join(directory, name)
+                with contextlib.suppress(FileNotFoundError):
+                    if name.endswith(".tmp") and now - os.path.getmtime(full) > STALE_TMP_SECONDS:
+                        if os.path.isdir(full):
+                            shutil.rmtree(full, ignore_errors=True)
+                        else:
+                            os.remove(full)
+        for name in os.listdir(self.path):
+            full = os.path.join(self.path, name)
+            if (os.path.isdir(full) and full != self.scores_path and not name.endswith(".tmp")
+                    and name not in index):
+                shutil.rmtree(full, ignore_errors=True)
+        score_files = [(name, os.path.getsize(name)) for name in self._score_files()]
+        total = sum(entry["size"] for entry in index.values()) + sum(size for _, size in score_files)
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= index.pop(key)["size"]
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+        # Then the oldest score files (file names start with their write time)
+        for name, size in score_files:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(name)
+
+_default_cache = None
+
+def default_cache() -> SBoxCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SBoxCache()
+    return _default_cache
+
+def cached_analysis(sbox) -> SBoxAnalysis:
+    return default_cache().analyze(sbox)
@@ -0,0 +1,144 @@
+# Affine-equivalence deduplication of search candidates
+# Affine-equivalent S-boxes share their DDT and |LAT| spectra, hence the
+# (du, lu) score, so only one representative per class has to be scored.
+#
+# In generate_sbox the constant c only XORs the output, so every constant of
+# a (poly, M) pair is in the same class and only c-normalized S-boxes
+# (S(0) = 0) are compared.  Those are bucketed by a DDT-spectrum fingerprint
+# and collisions are confirmed with the linear equivalence algorithm of
+# Biryukov et al. (guess A on one point, propagate through linearity,
+# backtrack on contradiction).  A match is always a real equivalence; an
+# equivalence that needs an input constant is missed, which only costs an
+# extra representative.
+
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from sbox_analysis import as_sbox_array, ddt_table, inverse_sbox
+from sbox_search import FULL_SPACE, SearchSpace, evaluate_sbox, generate_sbox
+
+def fingerprint(sbox) -> str:
+    """Hash of the DDT value histogram, an affine invariant."""
+    ddt = ddt_table(sbox)
+    return hashlib.sha256(np.bincount(ddt[1:].ravel(), minlength=257).tobytes()).hexdigest()
+
+class _LinearMap:
+    """Partial linear bijection kept as its full table on the spanned subspace."""
+
+    def __init__(self):
+        self.fwd = [-1] * 256
+        self.inv = [-1] * 256
+        self.fwd[0] = self.inv[0] = 0
+        self.domain = [0]
+
+    def copy(self):
+        other = _LinearMap.__new__(_LinearMap)
+        other.fwd = self.fwd[:]
+        other.inv = self.inv[:]
+        other.domain = self.domain[:]
+        return other
+
+    def add(self, x, y, new_pairs) -> bool:
+        """Impose x -> y; returns False on contradiction, appends new pairs."""
+        if self.fwd[x] != -1:
+            return self.fwd[x] == y
+        if self.inv[y] != -1:
+            return False
+        added = [(u ^ x, self.fwd[u] ^ y) for u in self.domain]
+        for u, v in added:
+            self.fwd[u] = v
+            self.inv[v] = u
+        self.domain.extend(u for u, _ in added)
+        new_pairs.extend(added)
+        return True
+
+def _propagate(a, b, s1, s2, s2_inv, s1_inv, pending_a, pending_b) -> bool:
+    # S2 = B o S1 o A, tracked as A: x -> A(x) and B^-1: S2(x) -> S1(A(x))
+    while pending_a or pending_b:
+        if pending_a:
+            x, y = pending_a.pop()
+            if not b.add(s2[x], s1[y], pending_b):
+                return False
+        else:
+            p, q = pending_b.pop()
+            if not a.add(s2_inv[p], s1_inv[q], pending_a):
+                return False
+    return True
+
+def _search(a, b, s1, s2, s2_inv, s1_inv) -> Optional[Tuple[List[int], List[int]]]:
+    if len(a.domain) == 256:
+        return a.fwd, b.fwd
+    x = a.fwd.index(-1)
+    for y in range(1, 256):
+        if a.inv[y] != -1:
+            continue
+        a2, b2 = a.copy(), b.copy()
+        pending_a = []
+        if a2.add(x, y, pending_a) and _propagate(a2, b2, s1, s2, s2_inv, s1_inv, pending_a, []):
+            found = _search(a2, b2, s1, s2, s2_inv, s1_inv)
+            if found is not None:
+                return found
+    return None
+
+def linear_equivalence(s1, s2) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Linear A, B with s2 = B o s1 o A as lookup tables (B given as B^-1), or None.
+
+    Both S-boxes must be permutations with S(0) = 0.
+    """
+    s1 = as_sbox_array(s1).tolist()
+    s2 = as_sbox_array(s2).tolist()
+    if s1[0] != 0 or s2[0] != 0:
+        raise ValueError("S-Boxes must map 0 to 0")
+    s1_inv = inverse_sbox(s1).tolist()
+    s2_inv = inverse_sbox(s2).tolist()
+    found = _search(_LinearMap(), _LinearMap(), s1, s2, s2_inv, s1_inv)
+    if found is None:
+        return None
+    return np.array(found[0]), np.array(found[1])
+
+def normalize(sbox) -> np.ndarray:
+    sbox = as_sbox_array(sbox)
+    return sbox ^ sbox[0]
+
+class EquivalenceClass(NamedTuple):
+    representative: Tuple[int, int]  # (poly index, multiplier index)
+    members: List[Tuple[int, int]]   # every (poly index, multiplier index), in index order
+
+def classify(space: SearchSpace = FULL_SPACE) -> List[EquivalenceClass]:
+    """Partition the (poly, M) pairs of `space` into affine-equivalence classes."""
+    buckets: Dict[str, List[Tuple[np.ndarray, EquivalenceClass]]] = {}
+    classes = []
+    for pi, poly in enumerate(space.polys):
+        for mi, M in enumerate(space.multipliers):
+            sbox = normalize(generate_sbox(poly, M, 0))
+            bucket = buckets.setdefault(fingerprint(sbox), [])
+            for rep_sbox, cls in bucket:
+                if linear_equivalence(rep_sbox, sbox) is not None:
+                    cls.members.append((pi, mi))
+                    break
+            else:
+                cls = EquivalenceClass((pi, mi), [(pi, mi)])
+                bucket.append((sbox, cls))
+                classes.append(cls)
+    return classes
+
+def _member_indices(space: SearchSpace, member: Tuple[int, int]) -> range:
+    start = (member[0] * len(space.multipliers) + member[1]) * len(space.constants)
+    return range(start, start + len(space.constants))
+
+def run_class_search(space: SearchSpace = FULL_SPACE, k: int = 10,
+                     classes: Optional[List[EquivalenceClass]] = None) -> List[dict]:
+    """Same top-k entries as sbox_search.run_search, scoring one S-box per class."""
+    classes = classify(space) if classes is None else classes
+    scored = []
+    for cls in classes:
+        pi, mi = cls.representative
+        score = evaluate_sbox(generate_sbox(space.polys[pi], space.multipliers[mi], space.constants[0]))
+        indices = sorted(i for member in cls.members for i in _member_indices(space, member))
+        scored.append((score, indices))
+    # Equal scores are ranked by index, as in TopK
+    candidates = sorted(((score, i) for score, indices in scored for i in indices[:k]))
+    return [{"score": list(score), "index": i, "params": list(space.params(i))}
+            for score, i in candidates[:k]]
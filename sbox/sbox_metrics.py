@@ -0,0 +1,127 @@
+# Batched S-box metrics beyond the DDT/LAT/BCT maxima
+# Every metric is computed for a batch of S-boxes shaped (N, 256).  The DDT
+# and the Walsh spectrum are computed once per batch and shared: the DDT
+# gives SAC, BIC-SAC, the differential branch number and the DDT spectrum;
+# the Walsh spectrum gives nonlinearity, BIC nonlinearity, the linear branch
+# number and the LAT spectrum.
+
+from typing import NamedTuple
+
+import numpy as np
+
+from sbox_analysis import as_sbox_array, ddt_table, walsh_table
+
+METRICS_CHUNK = 32  # S-boxes per batch; a chunk holds two (32, 256, 256) tables
+
+WEIGHT = np.array([bin(x).count("1") for x in range(256)], dtype=np.int64)
+BITS = 1 << np.arange(8)
+# bit j of every 8-bit value, shape (256, 8)
+BIT_MATRIX = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.int64)
+# output masks of the pairs f_j ^ f_k, j < k
+PAIRS = [(j, k) for j in range(8) for k in range(j + 1, 8)]
+PAIR_MASKS = np.array([(1 << j) | (1 << k) for j, k in PAIRS])
+
+class SBoxMetrics(NamedTuple):
+    nonlinearity: np.ndarray             # (N,) 128 - max |W(a, b)| / 2 over b != 0
+    algebraic_degree: np.ndarray         # (N,) max degree of the coordinate functions
+    coordinate_degrees: np.ndarray       # (N, 8)
+    sac: np.ndarray                      # (N, 8, 8) P[output bit j flips | input bit i flips]
+    bic_sac: np.ndarray                  # (N, 8, 28) same for f_j ^ f_k, pairs in PAIRS order
+    bic_nonlinearity: np.ndarray         # (N,) min nonlinearity of f_j ^ f_k
+    fixed_points: np.ndarray             # (N,) #{x : S(x) = x}
+    opposite_fixed_points: np.ndarray    # (N,) #{x : S(x) = ~x}
+    differential_branch_number: np.ndarray  # (N,) min wt(dx) + wt(dy) with DDT[dx, dy] > 0
+    linear_branch_number: np.ndarray     # (N,) min wt(a) + wt(b) with W(a, b) != 0, b != 0
+    ddt_spectrum: np.ndarray             # (N, 257) histogram of DDT[1:, :]
+    lat_spectrum: np.ndarray             # (N, 129) histogram of |LAT[1:, 1:]|
+
+def mobius(values):
+    """Binary Möbius transform (truth table -> ANF) along the last axis (length 256)."""
+    a = np.array(values, dtype=np.uint8)
+    lead = a.shape[:-1]
+    n = a.shape[-1]
+    h = 1
+    while h < n:
+        a = a.reshape(lead + (n // (2 * h), 2, h))
+        a[..., 1, :] ^= a[..., 0, :]
+        h *= 2
+    return a.reshape(lead + (n,))
+
+def _batched_bincount(values, length):
+    """Row-wise histogram of non-negative integers, values shaped (N, ...)."""
+    n = values.shape[0]
+    flat = values.reshape(n, -1) + (np.arange(n) * length)[:, None]
+    return np.bincount(flat.ravel(), minlength=n * length).reshape(n, length)
+
+def _metrics_chunk(sbox) -> SBoxMetrics:
+    n = len(sbox)
+    ddt = ddt_table(sbox)
+    walsh = walsh_table(sbox)
+    spectrum = np.abs(walsh)
+
+    linearity = spectrum[:, :, 1:].max(axis=(1, 2))
+    pair_spectrum = spectrum[:, :, PAIR_MASKS]
+    bic_linearity = pair_spectrum.max(axis=(1, 2))
+
+    # ANF of each coordinate function; the degree is the heaviest monomial
+    coordinates = ((sbox[:, None, :] >> np.arange(8)[:, None]) & 1).astype(np.uint8)
+    anf = mobius(coordinates)
+    coordinate_degrees = np.where(anf.astype(bool), WEIGHT, 0).max(axis=-1)
+
+    # DDT rows of the unit input differences: counts of each output difference
+    unit_rows = ddt[:, BITS, :]  # (N, 8, 256)
+    sac = unit_rows @ BIT_MATRIX / 256
+    pair_flips = BIT_MATRIX[:, [j for j, _ in PAIRS]] ^ BIT_MATRIX[:, [k for _, k in PAIRS]]
+    bic_sac = unit_rows @ pair_flips / 256
+
+    x = np.arange(256)
+    weight_sum = WEIGHT[:, None] + WEIGHT[None, :]
+    no_diff = np.where(ddt[:, 1:] > 0, weight_sum[1:], 1 << 16).min(axis=(1, 2))
+    no_corr = np.where(walsh[:, :, 1:] != 0, weight_sum[:, 1:], 1 << 16).min(axis=(1, 2))
+
+    return SBoxMetrics(
+        nonlinearity=128 - linearity // 2,
+        algebraic_degree=coordinate_degrees.max(axis=-1),
+        coordinate_degrees=coordinate_degrees,
+        sac=sac,
+        bic_sac=bic_sac,
+        bic_nonlinearity=128 - bic_linearity // 2,
+        fixed_points=(sbox == x).sum(axis=-1),
+        opposite_fixed_points=(sbox == x ^ 0xFF).sum(axis=-1),
+        differential_branch_number=no_diff,
+        linear_branch_number=no_corr,
+        ddt_spectrum=_batched_bincount(ddt[:, 1:], 257),
+        lat_spectrum=_batched_bincount(spectrum[:, 1:, 1:] // 2, 129),
+    )
+
+def sbox_metrics(sboxes, chunk_size=METRICS_CHUNK) -> SBoxMetrics:
+    """All metrics for a single S-box or a batch (N, 256); fields gain a leading N axis."""
+    sboxes = as_sbox_array(sboxes)
+    single = sboxes.ndim == 1
+    sboxes = sboxes.reshape(-1, 256)
+    chunks = [_metrics_chunk(sboxes[i:i + chunk_size]) for i in range(0, len(sboxes), chunk_size)]
+    metrics = SBoxMetrics(*(np.concatenate(field) for field in zip(*chunks)))
+    if single:
+        metrics = SBoxMetrics(*(field[0] for field in metrics))
+    return metrics
+
+def sac_deviation(metrics: SBoxMetrics):
+    """Largest |P - 1/2| over the SAC matrix, per S-box."""
+    return np.abs(metrics.sac - 0.5).max(axis=(-2, -1))
+
+def bic_sac_deviation(metrics: SBoxMetrics):
+    return np.abs(metrics.bic_sac - 0.5).max(axis=(-2, -1))
+
+def rank_key(metrics: SBoxMetrics, i: int):
+    """Sort key for S-box i of a batch, smaller is better.
+
+    Ties on the search score (du, linearity) are broken by higher algebraic
+    degree, higher BIC nonlinearity, smaller SAC deviation and fewer fixed
+    and opposite-fixed points.
+    """
+    return (
+        -int(metrics.algebraic_degree[i]),
+        -int(metrics.bic_nonlinearity[i]),
+        round(float(sac_deviation(metrics)[i]), 6),
+        int(metrics.fixed_points[i] + metrics.opposite_fixed_points[i]),
+    )
@@ -0,0 +1,143 @@
+# Swap-based local search over S-boxes
+# The DDT and Walsh tables are mutable state.  Swapping two outputs S(u),
+# S(v) only changes the DDT pairs that touch u or v (at most four x per
+# input difference, so O(256) cells), and changes the Walsh table by the
+# rank-one term (s_a(u) - s_a(v)) * (s_b(S(v)) - s_b(S(u))) with
+# s_a(x) = (-1)^(a·x).  A swap is its own inverse, so undo replays it.
+
+import math
+import random
+from typing import Optional
+
+import numpy as np
+
+from sbox_analysis import PARITY, as_sbox_array, ddt_table, inverse_sbox, walsh_table
+
+_DX = np.arange(1, 256)
+_MASKS = np.arange(256)
+
+def _signs(x):
+    """s_a(x) = (-1)^(a·x) for every mask a."""
+    return 1 - 2 * PARITY[_MASKS & x].astype(np.int32)
+
+class SBoxState:
+    """A bijective S-box with incrementally maintained DDT and Walsh tables."""
+
+    def __init__(self, sbox):
+        self.sbox = as_sbox_array(sbox).copy()
+        inverse_sbox(self.sbox)  # only permutations keep the tables meaningful
+        self.ddt = ddt_table(self.sbox).astype(np.int32)
+        self.walsh = walsh_table(self.sbox).astype(np.int32)
+        # histogram of DDT[1:] values, so the maximum and its count are O(1) lookups
+        self.ddt_hist = np.bincount(self.ddt[1:].ravel(), minlength=257)
+        self.history = []
+
+    def _ddt_cells(self, u, v):
+        xs = np.stack([np.full(255, u), u ^ _DX, np.full(255, v), v ^ _DX])
+        dxs = np.broadcast_to(_DX, xs.shape)
+        keep = np.ones(xs.shape, dtype=bool)
+        if u != v:
+            keep[2:, (u ^ v) - 1] = False  # x = v, v ^ dx repeat u ^ dx, u
+        xs, dxs = xs[keep], dxs[keep]
+        return dxs, xs ^ dxs, xs
+
+    def _update_ddt(self, u, v):
+        dxs, partners, xs = self._ddt_cells(u, v)
+        old = dxs * 256 + (self.sbox[xs] ^ self.sbox[partners])
+        self.sbox[u], self.sbox[v] = self.sbox[v], self.sbox[u]
+        new = dxs * 256 + (self.sbox[xs] ^ self.sbox[partners])
+        cells = np.unique(np.concatenate([old, new]))
+        flat = self.ddt.reshape(-1)
+        self.ddt_hist -= np.bincount(flat[cells], minlength=257)
+        np.subtract.at(flat, old, 1)
+        np.add.at(flat, new, 1)
+        self.ddt_hist += np.bincount(flat[cells], minlength=257)
+
+    def swap(self, u: int, v: int, record: bool = True):
+        if u == v:
+            return
+        su, sv = int(self.sbox[u]), int(self.sbox[v])
+        self.walsh += np.outer(_signs(u) - _signs(v), _signs(sv) - _signs(su))
+        self._update_ddt(u, v)
+        if record:
+            self.history.append((u, v))
+
+    def undo(self):
+        u, v = self.history.pop()
+        self.swap(u, v, record=False)
+
+    def differential_uniformity(self) -> int:
+        return int(np.flatnonzero(self.ddt_hist)[-1])
+
+    def linearity(self) -> int:
+        return max(int(np.abs(self.walsh[1:]).max()), int(np.abs(self.walsh[0, 1:]).max()))
+
+    def cost(self):
+        """(du, #cells at du, linearity, #cells at linearity), smaller is better."""
+        du = self.differential_uniformity()
+        lin = self.linearity()
+        lin_count = int((np.abs(self.walsh) == lin).sum()) - (lin == 256)
+        return du, int(self.ddt_hist[du]), lin, lin_count
+
+# Annealing energy: the cost tuple packed into one integer in the same
+# order (counts are at most 65536, uniformities at most 256), so every
+# worse cost has a positive energy rise.  A rise of 1 is one more cell at
+# the maximal Walsh value.
+def energy(cost) -> int:
+    du, du_count, lin, lin_count = cost
+    return ((du * 65537 + du_count) * 257 + lin) * 65537 + lin_count
+
+def optimize(sbox, steps: int = 10000, temperature: float = 0.0, seed: Optional[int] = None,
+             on_improve=None):
+    """Hill-climb (or anneal, with temperature > 0) by random output swaps.
+
+    Moves that do not worsen the cost are kept; worse ones are kept with
+    probability exp(-delta / T), where delta is the rise in energy() and the
+    temperature T decays linearly to 0.  Acceptance draws from its own
+    generator, so every temperature tries the same swap sequence for a seed.
+    Returns (best S-box, best cost).
+    """
+    rng = random.Random(seed)
+    accept_rng = random.Random(rng.getrandbits(64))
+    state = SBoxState(sbox)
+    current = best = state.cost()
+    best_sbox = state.sbox.copy()
+    for step in range(steps):
+        u, v = rng.sample(range(256), 2)
+        state.swap(u, v)
+        cost = state.cost()
+        t = temperature * (1 - step / steps)
+        delta = energy(cost) - energy(current)
+        if delta <= 0 or (t > 0 and accept_rng.random() < math.exp(-delta / t)):
+            current = cost
+            if cost < best:
+                best, best_sbox = cost, state.sbox.copy()
+                if on_improve:
+                    on_improve(step, best)
+        else:
+            state.undo()
+        state.history.clear()
+    return best_sbox, best
+
+if __name__ == "__main__":
+    import argparse
+    from compact_sbox import generate_sbox
+
+    parser = argparse.ArgumentParser(description="Swap-based local search seeded from a compact S-box")
+    parser.add_argument("--poly", type=lambda s: int(s, 0), default=0x11b)
+    parser.add_argument("--multiplier", type=int, default=1)
+    parser.add_argument("--constant", type=int, default=0x63)
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    seed_sbox = generate_sbox(args.poly, args.multiplier, args.constant)
+    print("Seed cost (du, #du, linearity, #linearity):", SBoxState(seed_sbox).cost())
+    best_sbox, best = optimize(seed_sbox, args.steps, args.temperature, args.seed,
+                               on_improve=lambda step, cost: print(f"step {step}: {cost}"))
+    print("Best cost:", best)
+    if args.temperature > 0:
+        # Same seed, so the same swaps: annealing should not end behind plain hill-climbing
+        print("Hill-climb (T = 0) cost:", optimize(seed_sbox, args.steps, 0.0, args.seed)[1])
+    print("Best S-box (first 16 bytes):", best_sbox[:16].tolist())
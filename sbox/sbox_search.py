@@ -0,0 +1,155 @@
+# Full-space compact S-box search (Algorithm 1)
+# Candidates S(x) = A(M * x^-1) ^ c range over every polynomial in POLY_LIST,
+# multiplier M and constant c.  The DDT is scored first; the LAT is computed
+# a few output masks at a time and abandoned as soon as the candidate can no
+# longer enter the running top-K.  Progress is checkpointed to a JSON file so
+# an interrupted search resumes where it stopped.
+
+import heapq
+import json
+import os
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+from gf256 import POLY_LIST, gf_mul_array, inverse_table
+from compact_sbox import AFFINE_LUT
+from sbox_analysis import ddt_table, walsh_table
+
+LAT_MASK_CHUNK = 32
+
+class SearchSpace(NamedTuple):
+    polys: Tuple[int, ...]
+    multipliers: Tuple[int, ...]
+    constants: Tuple[int, ...]
+
+    def __len__(self):
+        return len(self.polys) * len(self.multipliers) * len(self.constants)
+
+    def params(self, index: int) -> Tuple[int, int, int]:
+        rest, ci = divmod(index, len(self.constants))
+        pi, mi = divmod(rest, len(self.multipliers))
+        return self.polys[pi], self.multipliers[mi], self.constants[ci]
+
+FULL_SPACE = SearchSpace(tuple(POLY_LIST), tuple(range(1, 256)), tuple(range(256)))
+
+def generate_sbox(poly: int, M: int, c: int) -> np.ndarray:
+    """Same S-box as compact_sbox.generate_sbox, as a uint8 array."""
+    return AFFINE_LUT[gf_mul_array(inverse_table(poly), M, poly)] ^ np.uint8(c)
+
+def evaluate_sbox(sbox, bound: Optional[Tuple[int, int]] = None, cache=None) -> Optional[Tuple[int, int]]:
+    """Return (differential uniformity, linearity), or None once it cannot beat `bound`.
+
+    A candidate is only kept if its score is strictly below `bound`, so the
+    LAT stops as soon as (du, running linearity) reaches it.  With `cache`
+    (an SBoxCache), stored scores are reused and new ones, including the
+    partial scores of pruned candidates, are queued for its score store.
+    """
+    if cache is not None:
+        metrics = cache.metrics(sbox)
+        if metrics is not None:
+            return metrics["differential_uniformity"], metrics["linearity"]
+        stored = cache.score(sbox)
+        if stored is not None:
+            du, lu, exact = stored
+            if exact:
+                return du, lu
+            if bound is not None and (du, lu) >= bound:
+                return None
+    du = int(ddt_table(sbox)[1:].max())
+    lu = 0
+    if bound is None or du <= bound[0]:
+        for start in range(0, 256, LAT_MASK_CHUNK):
+            walsh = np.abs(walsh_table(sbox, range(start, start + LAT_MASK_CHUNK)))
+            if start == 0:
+                walsh[0, 0] = 0
+            lu = max(lu, int(walsh.max()))
+            if bound is not None and (du, lu) >= bound:
+                break
+        else:
+            if cache is not None:
+                cache.record_score(sbox, du, lu)
+            return du, lu
+    if cache is not None:
+        cache.record_score(sbox, du, lu, exact=False)
+    return None
+
+class TopK:
+    """The k best (score, index) entries seen so far; ties keep the earlier index."""
+
+    def __init__(self, k: int, entries=()):
+        self.k = k
+        self._heap = []  # max-heap on (score, index) via negation
+        self._indices = set()
+        for entry in entries:
+            self.offer(tuple(entry["score"]), entry["index"], tuple(entry["params"]))
+
+    def worst(self) -> Optional[Tuple[int, int, int]]:
+        """(du, lu, index) a candidate must beat once the heap is full."""
+        if len(self._heap) < self.k:
+            return None
+        (du, lu), index, _ = self._heap[0]
+        return -du, -lu, -index
+
+    def bound(self) -> Optional[Tuple[int, int]]:
+        worst = self.worst()
+        return None if worst is None else worst[:2]
+
+    def offer(self, score, index, params) -> bool:
+        if index in self._indices:
+            return False
+        item = ((-score[0], -score[1]), -index, tuple(params))
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            self._indices.discard(-heapq.heapreplace(self._heap, item)[1])
+        else:
+            return False
+        self._indices.add(index)
+        return True
+
+    def entries(self) -> List[dict]:
+        ordered = sorted(self._heap, key=lambda item: ((-item[0][0], -item[0][1]), -item[1]))
+        return [{"score": [-s[0], -s[1]], "index": -i, "params": list(p)} for s, i, p in ordered]
+
+def _space_dict(space: SearchSpace) -> dict:
+    return {"polys": list(space.polys), "multipliers": list(space.multipliers),
+            "constants": list(space.constants)}
+
+def load_checkpoint(path: str, space: SearchSpace, k: int):
+    """Return (next index, TopK) from `path`, or a fresh start if it does not exist."""
+    if not path or not os.path.exists(path):
+        return 0, TopK(k)
+    with open(path) as f:
+        state = json.load(f)
+    if state["space"] != _space_dict(space) or state["k"] != k:
+        raise ValueError(f"Checkpoint {path} was written for a different search")
+    return state["next_index"], TopK(k, state["top"])
+
+def save_checkpoint(path: str, space: SearchSpace, top: TopK, next_index: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"space": _space_dict(space), "k": top.k, "next_index": next_index,
+                   "top": top.entries()}, f)
+    os.replace(tmp, path)
+
+def run_search(space: SearchSpace = FULL_SPACE, k: int = 10, checkpoint: Optional[str] = None,
+               checkpoint_every: int = 1000, on_update=None, cache=None) -> List[dict]:
+    """Scan `space` in index order and return the top-k entries, best first.
+
+    `on_update(entries)` is called whenever the running top-k changes.
+    """
+    index, top = load_checkpoint(checkpoint, space, k)
+    while index < len(space):
+        params = space.params(index)
+        score = evaluate_sbox(generate_sbox(*params), top.bound(), cache)
+        if score is not None and top.offer(score, index, params) and on_update:
+            on_update(top.entries())
+        index += 1
+        if checkpoint and (index % checkpoint_every == 0 or index == len(space)):
+            save_checkpoint(checkpoint, space, top, index)
+    if cache is not None:
+        cache.flush_scores()
+    return top.entries()